@@ -1,38 +1,66 @@
+import os
+
 from flask import Flask
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
 from flask_smorest import Api
 
-from db import db
+from auth import identity_cache, register_jwt_callbacks
+from catalog import exercise_catalog
+from config import configs
+from db import db, engine_options, upgrade_database, upgrade_db_command
+from health import health_blp
+from instrumentation import instrumentation
+from jobs import job_queue
+from passwords import password_hasher
+from response_cache import response_cache
 from routes import blp
+from serialization import FastJSONProvider
 
-app = Flask(__name__)
+jwt = JWTManager()
+migrate = Migrate(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+register_jwt_callbacks(jwt)
 
-app.config['SECRET_KEY'] = 'secretKey'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///workout.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = 'JWTsecretKey'
 
-app.config["API_TITLE"] = "Workout-API"
-app.config["API_VERSION"] = "v1"
-app.config["OPENAPI_VERSION"] = "3.1.1"
-app.config["OPENAPI_URL_PREFIX"] = "/" 
-app.config["OPENAPI_SWAGGER_UI_PATH"] = "/swagger-ui"
-app.config["OPENAPI_SWAGGER_UI_URL"] = "https://cdn.jsdelivr.net/npm/swagger-ui-dist/"
+def create_app(config=None):
+    # `config` is a name from config.configs, a config class/object, or a
+    # mapping of overrides applied on top of the APP_CONFIG environment default
+    app = Flask(__name__)
 
+    if config is None or isinstance(config, dict):
+        app.config.from_object(configs[os.environ.get('APP_CONFIG', 'development')])
+        app.config.update(config or {})
+    elif isinstance(config, str):
+        app.config.from_object(configs[config])
+    else:
+        app.config.from_object(config)
+    app.config.setdefault(
+        'SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+    )
 
-db.init_app(app)
-bcrypt = Bcrypt()
-jwt = JWTManager()
-api = Api(app)
+    if app.config.get('JSON_FAST_ENCODER'):
+        app.json = FastJSONProvider(app)
 
-with app.app_context():
-    bcrypt.init_app(app)
+    db.init_app(app)
+    migrate.init_app(app, db)
+    password_hasher.init_app(app)
     jwt.init_app(app)
+    identity_cache.init_app(app)
+    exercise_catalog.init_app(app)
+    instrumentation.init_app(app)
+    response_cache.init_app(app)
+    job_queue.init_app(app)
+
+    api = Api(app)
+    api.register_blueprint(blp)
+    app.register_blueprint(health_blp)
+    app.cli.add_command(upgrade_db_command)
+
+    return app
 
-api.register_blueprint(blp)
 
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
-        db.create_all()
-    app.run(debug=True)
\ No newline at end of file
+        upgrade_database()
+    app.run()
@@ -0,0 +1,122 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from db import db
+from models import RevokedToken, User
+
+
+class TokenBlocklist:
+    # Revoked token ids kept only until the token would have expired anyway.
+    # A min-heap on expiry lets each call drop everything already expired.
+    # Per process, so it only backs short-lived access tokens; refresh token
+    # revocations are also written to the revoked_token table.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = {}
+        self._expiry_heap = []
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            self._evict_expired(time.time())
+            self._revoked[jti] = expires_at
+            heapq.heappush(self._expiry_heap, (expires_at, jti))
+
+    def is_revoked(self, jti):
+        with self._lock:
+            self._evict_expired(time.time())
+            return jti in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def _evict_expired(self, now):
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry_heap)
+            self._revoked.pop(jti, None)
+
+
+class IdentityCache:
+    # Bounded LRU of user id -> token claims, so issuing tokens on refresh
+    # does not need a User lookup.
+
+    def __init__(self, max_size=4096, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def init_app(self, app):
+        self.max_size = app.config.get('IDENTITY_CACHE_SIZE', 4096)
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', 300)
+
+    def put(self, user_id, claims):
+        with self._lock:
+            self._entries[str(user_id)] = (claims, time.monotonic() + self.ttl)
+            self._entries.move_to_end(str(user_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._entries.get(str(user_id))
+            if item is None:
+                return None
+            claims, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[str(user_id)]
+                return None
+            self._entries.move_to_end(str(user_id))
+            return claims
+
+    def claims_for(self, user_id):
+        claims = self.get(user_id)
+        if claims is None:
+            user = db.session.get(User, int(user_id))
+            if user is None:
+                return None
+            claims = user_claims(user)
+            self.put(user_id, claims)
+        return claims
+
+
+def user_claims(user):
+    return {'username': user.username}
+
+
+def revoke_session(token):
+    # Revokes the presented token and the refresh token of its login, which
+    # access tokens carry as the `rjti` claim, so no new access tokens can be
+    # minted. Other access tokens of the login expire on their own within
+    # JWT_ACCESS_TOKEN_EXPIRES on other processes.
+    blocklist.revoke(token['jti'], token['exp'])
+    refresh_jti = token['jti'] if token['type'] == 'refresh' else token.get('rjti')
+    if refresh_jti is None:
+        return
+    now = time.time()
+    blocklist.revoke(refresh_jti, now + current_app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+    if token['type'] == 'refresh':
+        expires_at = token['exp']
+    else:
+        expires_at = now + current_app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds()
+    RevokedToken.revoke(refresh_jti, datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None))
+    db.session.commit()
+
+
+blocklist = TokenBlocklist()
+identity_cache = IdentityCache()
+
+
+def register_jwt_callbacks(jwt):
+    @jwt.token_in_blocklist_loader
+    def _token_revoked(jwt_header, jwt_payload):
+        if blocklist.is_revoked(jwt_payload['jti']):
+            return True
+        if jwt_payload['type'] == 'refresh':
+            return RevokedToken.is_revoked(jwt_payload['jti'])
+        return blocklist.is_revoked(jwt_payload.get('rjti'))
@@ -0,0 +1,74 @@
+"""Logins per second per core for each bcrypt work factor.
+
+    python benchmarks/bcrypt_cost.py --rounds 10 11 12 13 --seconds 3
+
+Each cost level hashes one password and then verifies it in a tight loop on a
+single thread (one core) for the given duration, and again on a pool of
+--workers threads through PasswordHasher to show how the pool scales.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask
+
+from passwords import PasswordHasher
+
+
+def bench_rounds(rounds, seconds, workers):
+    app = Flask(__name__)
+    app.config['BCRYPT_LOG_ROUNDS'] = rounds
+    app.config['PASSWORD_HASH_WORKERS'] = workers
+    app.config['PASSWORD_HASH_QUEUE_SIZE'] = workers
+    app.config['PASSWORD_HASH_TIMEOUT'] = None
+    hasher = PasswordHasher(app)
+    pw_hash = hasher.bcrypt.generate_password_hash('benchmark-password').decode('utf-8')
+
+    checks = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        hasher.bcrypt.check_password_hash(pw_hash, 'benchmark-password')
+        checks += 1
+    single = checks / (time.perf_counter() - started)
+
+    def worker():
+        done = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            hasher.check(pw_hash, 'benchmark-password')
+            done += 1
+        return done
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(lambda _: worker(), range(workers)))
+    pooled = total / (time.perf_counter() - started)
+
+    return {
+        'rounds': rounds,
+        'ms_per_login': round(1000 / single, 2),
+        'logins_per_sec_per_core': round(single, 2),
+        'workers': workers,
+        'logins_per_sec_pool': round(pooled, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    results = [bench_rounds(rounds, args.seconds, args.workers) for rounds in args.rounds]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Synthetic dataset generator for benchmarks.
+
+Seeds the exercise catalog with seed.seed_exercises() and then bulk inserts
+users with workout plans, weight history and goals. Generation is
+deterministic for a given --seed, so two runs against the same parameters
+measure the same data.
+
+    python benchmarks/dataset.py --users 50 --plans 3 --weight-entries 2000
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+from db import db, upgrade_database
+from models import DailySession, Exercise, Goal, SessionExercise, TrainingVolume, User, WeightInsert, WorkoutPlan
+from passwords import password_hasher
+from seed import seed_exercises
+
+DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+GOAL_TYPES = ('weight_loss', 'weight_gain', 'workouts_per_week')
+BENCH_PASSWORD = 'benchmark-password'
+
+
+class DatasetSpec:
+    def __init__(self, users=10, plans=3, sessions=5, exercises=6, weight_entries=500,
+                 goals=2, seed=42):
+        self.users = users
+        self.plans = plans
+        self.sessions = min(sessions, len(DAYS))
+        self.exercises = exercises
+        self.weight_entries = weight_entries
+        self.goals = goals
+        self.seed = seed
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def bench_username(index):
+    return f'bench_user_{index}'
+
+
+def generate_dataset(spec):
+    # Must run inside an app context. Returns the ids of the generated users;
+    # every user's password is BENCH_PASSWORD.
+    rng = random.Random(spec.seed)
+    seed_exercises()
+    exercise_ids = [row.id for row in db.session.query(Exercise.id)]
+
+    pw_hash = password_hasher.bcrypt.generate_password_hash(BENCH_PASSWORD).decode('utf-8')
+    user_ids = db.session.scalars(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [
+            {'username': bench_username(i), 'email': f'{bench_username(i)}@example.com', 'password': pw_hash}
+            for i in range(spec.users)
+        ]
+    ).all()
+
+    plan_rows = [
+        {
+            'title': f'Plan {p + 1}',
+            'goal': 'General fitness',
+            'frequency': f'{spec.sessions}x per week',
+            'duration_min': rng.choice((30, 45, 60)),
+            'date_created': datetime(2026, 1, 1) + timedelta(days=p),
+            'user_id': user_id,
+        }
+        for user_id in user_ids
+        for p in range(spec.plans)
+    ]
+    plan_ids = db.session.scalars(
+        insert(WorkoutPlan).returning(WorkoutPlan.id, sort_by_parameter_order=True), plan_rows
+    ).all() if plan_rows else []
+
+    session_rows = [
+        {'day_of_week': DAYS[d], 'workout_plan_id': plan_id}
+        for plan_id in plan_ids
+        for d in range(spec.sessions)
+    ]
+    session_ids = db.session.scalars(
+        insert(DailySession).returning(DailySession.id, sort_by_parameter_order=True), session_rows
+    ).all() if session_rows else []
+
+    exercise_rows = [
+        {
+            'sets': rng.randint(2, 5),
+            'reps': rng.randint(6, 15),
+            'duration_min': None,
+            'distance_km': None,
+            'daily_session_id': session_id,
+            'exercise_id': rng.choice(exercise_ids),
+        }
+        for session_id in session_ids
+        for _ in range(spec.exercises)
+    ]
+    if exercise_rows:
+        db.session.execute(insert(SessionExercise), exercise_rows)
+    TrainingVolume.refresh(plan_ids)
+
+    start = datetime(2025, 1, 1)
+    for user_id in user_ids:
+        weight = rng.uniform(60, 100)
+        weight_rows = []
+        for i in range(spec.weight_entries):
+            weight += rng.uniform(-0.4, 0.35)
+            weight_rows.append({
+                'weight_kg': round(weight, 1),
+                'date_recorded': start + timedelta(hours=6 * i, minutes=rng.randint(0, 59)),
+                'user_id': user_id,
+            })
+        if weight_rows:
+            db.session.execute(insert(WeightInsert), weight_rows)
+
+    goal_rows = [
+        {
+            'goal_type': rng.choice(GOAL_TYPES),
+            'target_value': round(rng.uniform(55, 95), 1),
+            'is_achieved': False,
+            'user_id': user_id,
+        }
+        for user_id in user_ids
+        for _ in range(spec.goals)
+    ]
+    if goal_rows:
+        db.session.execute(insert(Goal), goal_rows)
+
+    db.session.commit()
+    return user_ids
+
+
+def add_spec_arguments(parser):
+    defaults = DatasetSpec()
+    parser.add_argument('--users', type=int, default=defaults.users)
+    parser.add_argument('--plans', type=int, default=defaults.plans, help='plans per user')
+    parser.add_argument('--sessions', type=int, default=defaults.sessions, help='sessions per plan (max 7)')
+    parser.add_argument('--exercises', type=int, default=defaults.exercises, help='exercises per session')
+    parser.add_argument('--weight-entries', type=int, default=defaults.weight_entries, help='weight entries per user')
+    parser.add_argument('--goals', type=int, default=defaults.goals, help='goals per user')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def spec_from_args(args):
+    return DatasetSpec(
+        users=args.users, plans=args.plans, sessions=args.sessions, exercises=args.exercises,
+        weight_entries=args.weight_entries, goals=args.goals, seed=args.seed
+    )
+
+
+def main():
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description='Fill the configured database with synthetic data.')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        upgrade_database()
+        user_ids = generate_dataset(spec_from_args(args))
+    print(f'Generated {len(user_ids)} users')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""Endpoint benchmark suite.
+
+Drives every route in routes.blp and reports p50/p95/p99 latency,
+requests/sec and SQL queries per request (read from the Server-Timing
+header) as JSON, so runs can be saved and diffed.
+
+In-process, against a fresh SQLite database filled by benchmarks/dataset.py:
+
+    python benchmarks/run.py --iterations 200 --output baseline.json
+
+Against a running server whose database was filled with dataset.py using the
+same --users count:
+
+    python benchmarks/run.py --url http://localhost:5000 --concurrency 8
+
+Compare with a previous run:
+
+    python benchmarks/run.py --compare baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import BENCH_PASSWORD, add_spec_arguments, bench_username, generate_dataset, spec_from_args
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class TestClientDriver:
+    mode = 'test_client'
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers or {})
+        return response.status_code, response.headers.get('Server-Timing', ''), response.get_json(silent=True)
+
+
+class HttpDriver:
+    mode = 'http'
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body=None, headers=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=dict(headers or {}))
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        try:
+            with urllib.request.urlopen(req) as response:
+                payload = response.read()
+                status, timing = response.status, response.headers.get('Server-Timing', '')
+        except urllib.error.HTTPError as e:
+            payload = e.read()
+            status, timing = e.code, e.headers.get('Server-Timing', '')
+        try:
+            return status, timing, json.loads(payload)
+        except ValueError:
+            return status, timing, None
+
+
+def build_scenarios(driver, run_id, tokens, exercise_ids, users):
+    def auth(i):
+        return {'Authorization': f"Bearer {tokens[i % len(tokens)]['access_token']}"}
+
+    def refresh_auth(i):
+        return {'Authorization': f"Bearer {tokens[i % len(tokens)]['refresh_token']}"}
+
+    # logout ends a login, so every call needs its own
+    logout_tokens = []
+
+    def prepare_logout(count):
+        logout_tokens[:] = [token['access_token'] for token in login_tokens(driver, users, count, cycle=True)]
+
+    job_ids = []
+
+    def prepare_jobs(count):
+        job_ids[:] = [driver.request('POST', '/goals/recompute', None, auth(i))[2]['id'] for i in range(len(tokens))]
+
+    plan = {
+        'title': 'Benchmark plan',
+        'goal': 'Throughput',
+        'frequency': '3x per week',
+        'duration_min': 45,
+        'daily_sessions': [
+            {
+                'day_of_week': day,
+                'session_exercises': [
+                    {'sets': 3, 'reps': 10, 'exercise_id': exercise_ids[(d * 4 + e) % len(exercise_ids)]}
+                    for e in range(4)
+                ]
+            } for d, day in enumerate(('Monday', 'Wednesday', 'Friday'))
+        ]
+    }
+
+    # name -> (method, path(i), body(i), headers(i)[, prepare(calls)])
+    return {
+        'register': ('POST', lambda i: '/register', lambda i: {
+            'username': f'b{run_id}_{i}', 'email': f'b{run_id}_{i}@example.com', 'password': BENCH_PASSWORD
+        }, lambda i: None),
+        'login': ('POST', lambda i: '/login', lambda i: {
+            'username': bench_username(i % users), 'password': BENCH_PASSWORD
+        }, lambda i: None),
+        'refresh': ('POST', lambda i: '/refresh', lambda i: None, refresh_auth),
+        'logout': ('POST', lambda i: '/logout', lambda i: None,
+                   lambda i: {'Authorization': f'Bearer {logout_tokens[i]}'}, prepare_logout),
+        'profile': ('GET', lambda i: '/profile', lambda i: None, auth),
+        'exercises': ('GET', lambda i: '/exercises', lambda i: None, lambda i: None),
+        'exercises_search': ('GET', lambda i: '/exercises/search?q=squat', lambda i: None, lambda i: None),
+        'workout_plans_get': ('GET', lambda i: '/workout_plans', lambda i: None, auth),
+        'workout_plans_post': ('POST', lambda i: '/workout_plans', lambda i: plan, auth),
+        'workout_plans_batch': ('POST', lambda i: '/workout_plans/batch', lambda i: {'plans': [plan] * 5}, auth),
+        'weight_get': ('GET', lambda i: '/weight', lambda i: None, auth),
+        'weight_post': ('POST', lambda i: '/weight', lambda i: {'weight_kg': 70 + i % 10}, auth),
+        'goals_get': ('GET', lambda i: '/goals', lambda i: None, auth),
+        'goals_post': ('POST', lambda i: '/goals', lambda i: {
+            'goal_type': 'weight_loss', 'target_value': 65
+        }, auth),
+        'goals_recompute': ('POST', lambda i: '/goals/recompute', lambda i: None, auth),
+        'jobs_get': ('GET', lambda i: f'/jobs/{job_ids[i % len(job_ids)]}', lambda i: None, auth, prepare_jobs),
+        'stats_volume': ('GET', lambda i: '/stats/volume?group_by=day,exercise', lambda i: None, auth),
+        'export': ('GET', lambda i: '/export', lambda i: None, auth),
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(driver, scenario, iterations, warmup, concurrency):
+    method, path, body, headers = scenario[:4]
+    if len(scenario) > 4:
+        scenario[4](iterations + warmup)
+
+    def call(i):
+        started = time.perf_counter()
+        status, timing, _ = driver.request(method, path(i), body(i), headers(i))
+        elapsed = time.perf_counter() - started
+        match = SERVER_TIMING_QUERIES.search(timing)
+        return elapsed, status, int(match.group(1)) if match else None
+
+    for i in range(warmup):
+        call(iterations + i)
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(call, range(iterations)))
+    else:
+        samples = [call(i) for i in range(iterations)]
+    wall = time.perf_counter() - started
+
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        'iterations': iterations,
+        'errors': sum(1 for sample in samples if sample[1] >= 400),
+        'status_codes': dict(sorted(Counter(str(sample[1]) for sample in samples).items())),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        'requests_per_sec': round(iterations / wall, 2) if wall else 0.0,
+        'queries_avg': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+    }
+
+
+def login_tokens(driver, users, count, cycle=False):
+    # one login per user, or `count` logins cycling through the users
+    tokens = []
+    for i in range(count if cycle else min(users, count)):
+        username = bench_username(i % users)
+        status, _, body = driver.request('POST', '/login', {'username': username, 'password': BENCH_PASSWORD})
+        if status != 200:
+            raise SystemExit(f'Could not log in as {username} ({status}); was the dataset generated?')
+        tokens.append(body)
+    return tokens
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"{'scenario':<20}{'p50 ms':>18}{'p95 ms':>18}{'req/s':>18}{'queries':>12}")
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+
+        def delta(key):
+            before, after = old.get(key), result.get(key)
+            if not before or after is None:
+                return f'{after}'
+            return f'{after} ({(after - before) / before * 100:+.0f}%)'
+
+        print(f"{name:<20}{delta('p50_ms'):>18}{delta('p95_ms'):>18}{delta('requests_per_sec'):>18}{delta('queries_avg'):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every API route.')
+    parser.add_argument('--url', help='benchmark a running server instead of an in-process test client')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--scenarios', nargs='+', help='only run these scenarios')
+    parser.add_argument('--bcrypt-rounds', type=int, default=12, help='work factor for the in-process app')
+    parser.add_argument('--output', help='write the JSON report here')
+    parser.add_argument('--compare', help='print deltas against a previous JSON report')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+
+    if args.url:
+        driver = HttpDriver(args.url)
+        exercise_ids = [exercise['id'] for exercise in driver.request('GET', '/exercises?fields=id')[2]]
+        run_scenarios(args, spec, driver, exercise_ids)
+        return
+
+    from app import create_app
+    from db import upgrade_database
+    from models import Exercise
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'BCRYPT_LOG_ROUNDS': args.bcrypt_rounds,
+            'DEBUG': False,
+            # measure the endpoints, not cache hits
+            'RESPONSE_CACHE_ENABLED': False,
+        })
+        with app.app_context():
+            upgrade_database()
+            generate_dataset(spec)
+            exercise_ids = [row.id for row in Exercise.query.with_entities(Exercise.id)]
+        run_scenarios(args, spec, TestClientDriver(app), exercise_ids)
+
+
+def run_scenarios(args, spec, driver, exercise_ids):
+    tokens = login_tokens(driver, spec.users, 10)
+    scenarios = build_scenarios(driver, uuid.uuid4().hex[:8], tokens, exercise_ids, spec.users)
+    names = args.scenarios or list(scenarios)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'mode': driver.mode,
+            'url': args.url,
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'bcrypt_rounds': None if args.url else args.bcrypt_rounds,
+            'dataset': spec.as_dict(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+        },
+        'results': {},
+    }
+    for name in names:
+        report['results'][name] = run_scenario(driver, scenarios[name], args.iterations, args.warmup, args.concurrency)
+        print(f"{name:<20} p50 {report['results'][name]['p50_ms']:>9} ms  "
+              f"p99 {report['results'][name]['p99_ms']:>9} ms  "
+              f"{report['results'][name]['requests_per_sec']:>9} req/s  "
+              f"queries {report['results'][name]['queries_avg']}  "
+              f"status {report['results'][name]['status_codes']}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(report, args.compare)
+    elif not args.output:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
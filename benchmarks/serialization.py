@@ -0,0 +1,105 @@
+"""Serialization cost of a large GET /workout_plans tree.
+
+    python benchmarks/serialization.py --plans 20 --sessions 7 --exercises 10
+
+Compares the previous hand-written dict building + stdlib json, a plain
+marshmallow PlanSchema.dump(), and the compiled serializer + FastJSONProvider
+that the route uses now. Objects are in-memory stand-ins for ORM rows so only
+serialization is measured.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from schemas import PlanSchema
+from serialization import FastJSONProvider, compile_serializer, orjson
+
+
+def build_plans(plans, sessions, exercises):
+    exercise = SimpleNamespace(name='Bridge', description='d' * 120, guide='g' * 400)
+    return [
+        SimpleNamespace(
+            id=p, title=f'Plan {p}', goal='General fitness', frequency='5x per week', duration_min=45,
+            date_created=datetime(2026, 1, 1),
+            daily_sessions=[
+                SimpleNamespace(
+                    id=p * 10 + s, day_of_week='Monday',
+                    session_exercises=[
+                        SimpleNamespace(sets=3, reps=10, duration_min=None, distance_km=None, exercise=exercise)
+                        for _ in range(exercises)
+                    ]
+                ) for s in range(sessions)
+            ]
+        ) for p in range(plans)
+    ]
+
+
+def hand_written(plans):
+    plans_list = []
+    for plan in plans:
+        plan_data = {
+            'id': plan.id,
+            'title': plan.title,
+            'goal': plan.goal,
+            'frequency': plan.frequency,
+            'duration_min': plan.duration_min,
+            'date_created': plan.date_created.isoformat(),
+            'daily_sessions': []
+        }
+        for session in plan.daily_sessions:
+            session_data = {'id': session.id, 'day_of_week': session.day_of_week, 'exercises': []}
+            for session_ex in session.session_exercises:
+                exercise_details = session_ex.exercise
+                session_data['exercises'].append({
+                    'sets': session_ex.sets,
+                    'reps': session_ex.reps,
+                    'duration_min': session_ex.duration_min,
+                    'distance_km': session_ex.distance_km,
+                    'exercise_name': exercise_details.name,
+                    'exercise_description': exercise_details.description,
+                    'exercise_guide': exercise_details.guide
+                })
+            plan_data['daily_sessions'].append(session_data)
+        plans_list.append(plan_data)
+    return plans_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plans', type=int, default=20)
+    parser.add_argument('--sessions', type=int, default=7)
+    parser.add_argument('--exercises', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    plans = build_plans(args.plans, args.sessions, args.exercises)
+    app = Flask(__name__)
+    fast = FastJSONProvider(app)
+    schema = PlanSchema(many=True)
+    compiled = compile_serializer(schema)
+    assert compiled(plans) == schema.dump(plans) == hand_written(plans)
+
+    candidates = {
+        'hand_written+json': lambda: json.dumps(hand_written(plans), sort_keys=True, separators=(',', ':')),
+        'marshmallow+json': lambda: json.dumps(schema.dump(plans), sort_keys=True, separators=(',', ':')),
+        'compiled+json': lambda: json.dumps(compiled(plans), sort_keys=True, separators=(',', ':')),
+        'compiled+fast_provider': lambda: fast.dumps(compiled(plans)),
+    }
+    baseline = None
+    print(f'{args.plans * args.sessions * args.exercises} session exercises, orjson={"yes" if orjson else "no"}')
+    for name, fn in candidates.items():
+        ms = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat * 1000
+        baseline = baseline or ms
+        print(f'{name:<24}{ms:>9.3f} ms  ({ms / baseline:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import threading
+import time
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from db import db
+from models import CatalogVersion, Exercise
+
+EXERCISE_FIELDS = ('id', 'name', 'description', 'guide')
+
+
+class ExerciseCatalog:
+    # Serialized exercise list cached per field projection. Exercise writes
+    # bump the catalog_version row in their transaction; this process drops
+    # its cached bodies when the transaction commits, and every process
+    # re-reads the row at most every EXERCISE_CATALOG_CHECK_INTERVAL seconds,
+    # so writes from other workers or from seed.py are picked up too. The
+    # ETag is a hash of the body so it agrees across workers.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._entries = {}
+        self._db_version = None
+        self._checked_at = None
+        self.check_interval = 5
+
+    def init_app(self, app):
+        self.check_interval = app.config.get('EXERCISE_CATALOG_CHECK_INTERVAL', 5)
+        with self._lock:
+            self._checked_at = None
+        app.extensions['exercise_catalog'] = self
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def sync(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        db_version = db.session.query(CatalogVersion.version).filter_by(id=1).scalar()
+        with self._lock:
+            self._checked_at = now
+            changed = db_version != self._db_version
+            self._db_version = db_version
+        if changed:
+            self.invalidate()
+
+    def parse_fields(self, fields_param):
+        if not fields_param:
+            return EXERCISE_FIELDS
+        fields = tuple(dict.fromkeys(f.strip() for f in fields_param.split(',') if f.strip()))
+        unknown = [f for f in fields if f not in EXERCISE_FIELDS]
+        if unknown or not fields:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(EXERCISE_FIELDS)}")
+        return fields
+
+    def get(self, fields):
+        self.sync()
+        entry = self._entries.get(fields)
+        if entry is not None:
+            return entry
+
+        version = self._version
+        columns = [getattr(Exercise, field) for field in fields]
+        rows = db.session.query(*columns).order_by(Exercise.id).all()
+        body = json.dumps(
+            [dict(zip(fields, row)) for row in rows],
+            separators=(',', ':'),
+            ensure_ascii=False
+        ).encode('utf-8')
+        entry = (body, hashlib.sha256(body).hexdigest()[:32])
+
+        with self._lock:
+            if version == self._version:
+                self._entries[fields] = entry
+        return entry
+
+
+exercise_catalog = ExerciseCatalog()
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_catalog_version(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    changed = session.new | session.dirty | session.deleted
+    if not any(isinstance(obj, Exercise) for obj in changed):
+        return
+    connection = session.connection()
+    bumped = connection.execute(
+        update(CatalogVersion).where(CatalogVersion.id == 1).values(version=CatalogVersion.version + 1)
+    ).rowcount
+    if not bumped:
+        connection.execute(insert(CatalogVersion).values(id=1, version=1))
+    session.info['catalog_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_catalog(session):
+    # only after commit, so no other thread can cache the uncommitted rows
+    # under the new version
+    if session.info.pop('catalog_changed', False):
+        exercise_catalog.invalidate()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_catalog_change(session, previous_transaction):
+    session.info.pop('catalog_changed', None)
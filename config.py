@@ -0,0 +1,68 @@
+import os
+from datetime import timedelta
+
+from db import database_uri
+
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'secretKey')
+    SQLALCHEMY_DATABASE_URI = database_uri()
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'JWTsecretKey')
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+    IDENTITY_CACHE_SIZE = 4096
+    IDENTITY_CACHE_TTL = 300
+    EXERCISE_CATALOG_MAX_AGE = 300
+    EXERCISE_CATALOG_CHECK_INTERVAL = 5  # seconds between catalog_version reads
+    JSON_FAST_ENCODER = True  # uses orjson when installed
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND')  # "module:Class", default in-process LRU
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    RESPONSE_CACHE_MAX_ENTRIES = 10000
+    SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    # per process; under gunicorn both are capped to leave one request thread
+    # free, otherwise workers defaults to the CPU count and the queue to 32
+    PASSWORD_HASH_WORKERS = None
+    PASSWORD_HASH_QUEUE_SIZE = None
+    PASSWORD_HASH_TIMEOUT = 5
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_POLL_INTERVAL = 1.0
+    JOB_LEASE_SECONDS = 300  # a running job whose lease expires is retried; longer tasks call job_queue.heartbeat()
+    JOB_BACKOFF_BASE = 2.0
+    JOB_BACKOFF_MAX = 300.0
+
+    API_TITLE = "Workout-API"
+    API_VERSION = "v1"
+    OPENAPI_VERSION = "3.1.1"
+    OPENAPI_URL_PREFIX = "/"
+    OPENAPI_SWAGGER_UI_PATH = "/swagger-ui"
+    OPENAPI_SWAGGER_UI_URL = "https://cdn.jsdelivr.net/npm/swagger-ui-dist/"
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+    # the default in-process backend cannot see invalidations made by other
+    # gunicorn workers or `flask run-jobs`, so caching needs a shared store
+    RESPONSE_CACHE_ENABLED = bool(os.environ.get('RESPONSE_CACHE_BACKEND'))
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    BCRYPT_LOG_ROUNDS = 4
+    JOB_WORKERS = 0  # jobs run when the test calls job_queue.run_pending()
+
+
+configs = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
@@ -1,3 +1,76 @@
+import os
+import sqlite3
+
+import click
+from flask.cli import with_appcontext
+from flask_migrate import stamp, upgrade
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
+
+db = SQLAlchemy()
+
+DEFAULT_DATABASE_URI = 'sqlite:///workout.db'
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+# revision matching the schema db.create_all() used to build
+BASELINE_REVISION = '0001'
+
+
+def database_uri(environ=os.environ):
+    uri = environ.get('DATABASE_URL', DEFAULT_DATABASE_URI)
+    # Heroku-style URLs still use the scheme SQLAlchemy 1.4 dropped
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def engine_options(uri, environ=os.environ):
+    options = {
+        'pool_pre_ping': environ.get('DB_POOL_PRE_PING', '1').lower() not in ('0', 'false', 'no'),
+    }
+    if 'DB_POOL_RECYCLE' in environ:
+        options['pool_recycle'] = int(environ['DB_POOL_RECYCLE'])
+    elif not uri.startswith('sqlite'):
+        options['pool_recycle'] = 1800
+
+    # in-memory SQLite runs on a single shared connection without a sized pool
+    if uri in ('sqlite://', 'sqlite:///') or (uri.startswith('sqlite') and ':memory:' in uri):
+        return options
+
+    if 'DB_POOL_SIZE' in environ:
+        options['pool_size'] = int(environ['DB_POOL_SIZE'])
+    if 'DB_MAX_OVERFLOW' in environ:
+        options['max_overflow'] = int(environ['DB_MAX_OVERFLOW'])
+    if 'DB_POOL_TIMEOUT' in environ:
+        options['pool_timeout'] = int(environ['DB_POOL_TIMEOUT'])
+    return options
+
+
+@event.listens_for(Engine, 'connect')
+def _tune_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers proceed while a writer holds the lock, NORMAL skips the
+    # fsync per commit that WAL makes unnecessary, and the busy timeout makes
+    # concurrent writers wait instead of failing with "database is locked"
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+    cursor.close()
+
+
+def upgrade_database():
+    # databases created before migrations existed have the tables but no
+    # alembic_version; mark them as the baseline so only later revisions run
+    tables = inspect(db.engine).get_table_names()
+    if 'user' in tables and 'alembic_version' not in tables:
+        stamp(revision=BASELINE_REVISION)
+    upgrade()
+
 
-db = SQLAlchemy()
\ No newline at end of file
+@click.command('upgrade-db')
+@with_appcontext
+def upgrade_db_command():
+    """Bring the database schema up to the latest migration."""
+    upgrade_database()
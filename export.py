@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import select
+
+from db import db
+from models import DailySession, Goal, SessionExercise, WeightInsert, WorkoutPlan
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+YIELD_PER = 1000
+
+
+def _sections(user_id):
+    # (record type, columns, statement) in export order; every statement
+    # selects plain columns so rows are never materialized as ORM objects
+    return [
+        ('plan', (WorkoutPlan.id, WorkoutPlan.title, WorkoutPlan.goal, WorkoutPlan.frequency,
+                  WorkoutPlan.duration_min, WorkoutPlan.date_created),
+         lambda cols: select(*cols).where(WorkoutPlan.user_id == user_id).order_by(WorkoutPlan.id)),
+        ('session', (DailySession.id, DailySession.workout_plan_id, DailySession.day_of_week),
+         lambda cols: select(*cols).join(WorkoutPlan)
+         .where(WorkoutPlan.user_id == user_id).order_by(DailySession.id)),
+        ('session_exercise', (SessionExercise.id, SessionExercise.daily_session_id, SessionExercise.exercise_id,
+                              SessionExercise.sets, SessionExercise.reps, SessionExercise.duration_min,
+                              SessionExercise.distance_km),
+         lambda cols: select(*cols).join(DailySession).join(WorkoutPlan)
+         .where(WorkoutPlan.user_id == user_id).order_by(SessionExercise.id)),
+        ('weight', (WeightInsert.id, WeightInsert.weight_kg, WeightInsert.date_recorded),
+         lambda cols: select(*cols).where(WeightInsert.user_id == user_id)
+         .order_by(WeightInsert.date_recorded, WeightInsert.id)),
+        ('goal', (Goal.id, Goal.goal_type, Goal.target_value, Goal.is_achieved, Goal.progress_pct,
+                  Goal.current_value),
+         lambda cols: select(*cols).where(Goal.user_id == user_id).order_by(Goal.id)),
+    ]
+
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_records(user_id):
+    # yields (record type, dict) for every exported row, streaming each
+    # section through a server-side cursor in YIELD_PER sized batches
+    for record_type, columns, statement in _sections(user_id):
+        keys = [column.key for column in columns]
+        result = db.session.execute(statement(columns).execution_options(yield_per=YIELD_PER))
+        for row in result:
+            yield record_type, dict(zip(keys, (_value(v) for v in row)))
+
+
+def csv_header(user_id):
+    header = ['record_type']
+    for _, columns, _ in _sections(user_id):
+        for column in columns:
+            if column.key not in header:
+                header.append(column.key)
+    return header
+
+
+def _chunked(pieces, chunk_size=64 * 1024):
+    # the first piece goes out on its own so clients see bytes immediately;
+    # after that pieces are coalesced into chunk_size writes
+    buffer = []
+    size = 0
+    first = True
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if first or size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+            first = False
+    if buffer:
+        yield ''.join(buffer)
+
+
+def generate_ndjson(user_id):
+    return _chunked(
+        json.dumps({'type': record_type, **record}, separators=(',', ':')) + '\n'
+        for record_type, record in iter_records(user_id)
+    )
+
+
+def _csv_rows(user_id):
+    # one table; columns a record type does not have are left empty
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=csv_header(user_id), extrasaction='ignore')
+    writer.writeheader()
+    for record_type, record in iter_records(user_id):
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow({'record_type': record_type, **record})
+    yield buffer.getvalue()
+
+
+def generate_csv(user_id):
+    return _chunked(_csv_rows(user_id))
+
+
+def generate_export(user_id, export_format):
+    if export_format == 'csv':
+        return generate_csv(user_id)
+    return generate_ndjson(user_id)
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+
+from db import db
+from jobs import job_queue
+from models import Goal, WeightInsert
+from response_cache import response_cache
+
+# goal types whose progress follows the user's body weight. The direction is
+# the one the weight has to move in; target_weight infers it from the
+# starting weight.
+WEIGHT_GOAL_TYPES = {
+    'weight_loss': -1,
+    'weight_gain': 1,
+    'target_weight': None,
+}
+
+
+def latest_weight(user_id):
+    return (
+        db.session.query(WeightInsert.weight_kg)
+        .filter(WeightInsert.user_id == user_id)
+        .order_by(WeightInsert.date_recorded.desc(), WeightInsert.id.desc())
+        .limit(1)
+        .scalar()
+    )
+
+
+def start_goal(goal):
+    # seed a new goal's running state from the most recent weight entry
+    if goal.goal_type not in WEIGHT_GOAL_TYPES:
+        return
+    goal.progress_pct = 0.0
+    weight = latest_weight(goal.user_id)
+    if weight is not None:
+        goal.start_value = weight
+        _evaluate(goal, weight)
+
+
+def apply_weight(user_id, weight_kg):
+    # re-evaluate only the user's open weight goals against the new reading;
+    # changes are flushed with the caller's transaction
+    open_goals = Goal.query.filter(
+        Goal.user_id == user_id,
+        Goal.is_achieved.is_(False),
+        Goal.goal_type.in_(WEIGHT_GOAL_TYPES)
+    ).all()
+    for goal in open_goals:
+        if goal.start_value is None:
+            goal.start_value = weight_kg
+        _evaluate(goal, weight_kg)
+    return open_goals
+
+
+@job_queue.task('recompute_goals')
+def recompute_goals(payload):
+    # background job: bring every open weight goal up to date with the
+    # user's latest weight entry
+    user_id = payload['user_id']
+    weight = latest_weight(user_id)
+    if weight is None:
+        return {'updated': 0, 'weight_kg': None}
+    goals = apply_weight(user_id, weight)
+    db.session.commit()
+    response_cache.invalidate(user_id, 'goals')
+    return {'updated': len(goals), 'weight_kg': weight}
+
+
+def _evaluate(goal, current):
+    direction = WEIGHT_GOAL_TYPES[goal.goal_type]
+    if direction is None:
+        direction = 1 if goal.target_value >= goal.start_value else -1
+
+    goal.current_value = current
+    goal.updated_at = datetime.now(timezone.utc)
+
+    distance = (goal.target_value - goal.start_value) * direction
+    covered = (current - goal.start_value) * direction
+    if distance <= 0:
+        progress = 100.0 if covered >= distance else 0.0
+    else:
+        progress = covered / distance * 100
+    goal.progress_pct = round(max(0.0, min(100.0, progress)), 2)
+
+    if (current - goal.target_value) * direction >= 0:
+        goal.is_achieved = True
+        goal.progress_pct = 100.0
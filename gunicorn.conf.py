@@ -0,0 +1,42 @@
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+# SIGTERM lets in-flight requests finish for this long before workers are killed
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # with preload_app the app is built in the master; give each worker its
+    # own connection pool, password hashing threads and job workers
+    from db import db
+    from jobs import job_queue
+    from passwords import password_hasher
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+    password_hasher.init_app(app, request_threads=server.cfg.threads)
+    job_queue.start(app)
+
+
+def worker_exit(server, worker):
+    from db import db
+    from jobs import job_queue
+    from passwords import password_hasher
+
+    job_queue.shutdown(timeout=server.cfg.graceful_timeout)
+    password_hasher.shutdown()
+    app = worker.app.wsgi()
+    with app.app_context():
+        db.engine.dispose()
@@ -0,0 +1,25 @@
+from flask import Blueprint, current_app, jsonify
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from db import db
+
+health_blp = Blueprint('health', __name__)
+
+
+@health_blp.route('/healthz', methods=['GET'])
+def healthz():
+    # liveness: the process is up and serving requests
+    return jsonify(status='ok'), 200
+
+
+@health_blp.route('/readyz', methods=['GET'])
+def readyz():
+    # readiness: the database answers, so this worker can take traffic
+    try:
+        db.session.execute(text('SELECT 1'))
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception('Readiness check failed')
+        return jsonify(status='unavailable', database='unavailable'), 503
+    return jsonify(status='ok', database='ok'), 200
@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+import traceback
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('workout.sql')
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class Metrics:
+    # Per-process request and SQL metrics keyed by (method, route rule).
+    # Under gunicorn every worker keeps its own copy.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.latency = {}
+        self.queries = {}
+        self.db_seconds = {}
+        self.responses = {}
+        self.slow_queries = 0
+
+    def record_request(self, method, endpoint, status, seconds, query_count, db_seconds):
+        key = (method, endpoint)
+        with self._lock:
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(query_count)
+            self.db_seconds[key] = self.db_seconds.get(key, 0.0) + db_seconds
+            status_key = key + (str(status),)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+    def record_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP http_requests_total Requests served, by route and status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (method, endpoint, status), value in sorted(self.responses.items()):
+                lines.append(f'http_requests_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {value}')
+            lines += _render_histogram(
+                'http_request_duration_seconds', 'Request latency in seconds.', self.latency
+            )
+            lines += _render_histogram(
+                'http_request_db_queries', 'SQL statements executed per request.', self.queries
+            )
+            lines += [
+                '# HELP http_request_db_seconds_total Time spent in SQL per route.',
+                '# TYPE http_request_db_seconds_total counter',
+            ]
+            for (method, endpoint), value in sorted(self.db_seconds.items()):
+                lines.append(f'http_request_db_seconds_total{{method="{method}",endpoint="{endpoint}"}} {value:.6f}')
+            lines += [
+                '# HELP db_slow_queries_total SQL statements slower than the slow query threshold.',
+                '# TYPE db_slow_queries_total counter',
+                f'db_slow_queries_total {self.slow_queries}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+def _render_histogram(name, help_text, histograms):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for (method, endpoint), histogram in sorted(histograms.items()):
+        labels = f'method="{method}",endpoint="{endpoint}"'
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+def _call_site():
+    # innermost frame in this project's code, skipping this module
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith('<'):
+            continue
+        filename = os.path.abspath(frame.filename)
+        if (filename.startswith(PROJECT_ROOT)
+                and filename != __file__
+                and os.sep + 'site-packages' + os.sep not in filename):
+            return f'{os.path.relpath(filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+class Instrumentation:
+    def __init__(self, app=None):
+        self.metrics = Metrics()
+        self.slow_query_seconds = 0.1
+        self.collectors = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_query_seconds = app.config.get('SLOW_QUERY_THRESHOLD_MS', 100) / 1000
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self._metrics_view, methods=['GET'])
+        app.extensions['instrumentation'] = self
+
+    def add_collector(self, collector):
+        # collector() returns extra Prometheus text lines for /metrics
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    def _before_request(self):
+        g._perf_start = time.perf_counter()
+        g._perf_queries = 0
+        g._perf_db_seconds = 0.0
+
+    def _after_request(self, response):
+        start = g.get('_perf_start')
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        query_count = g._perf_queries
+        db_seconds = g._perf_db_seconds
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+        self.metrics.record_request(
+            request.method, endpoint, response.status_code, elapsed, query_count, db_seconds
+        )
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={elapsed * 1000:.2f}, db;dur={db_seconds * 1000:.2f};desc="{query_count} queries"'
+        )
+        return response
+
+    def _metrics_view(self):
+        body = self.metrics.render()
+        for collector in self.collectors:
+            body += '\n'.join(collector()) + '\n'
+        return Response(body, mimetype='text/plain; version=0.0.4')
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_perf_query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('_perf_query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+
+        if has_request_context() and '_perf_start' in g:
+            g._perf_queries += 1
+            g._perf_db_seconds += elapsed
+
+        if elapsed >= self.slow_query_seconds:
+            self.metrics.record_slow_query()
+            logger.warning(
+                'Slow query (%.1f ms) at %s: %s', elapsed * 1000, _call_site(), ' '.join(statement.split())
+            )
+
+
+instrumentation = Instrumentation()
+
+event.listen(Engine, 'before_cursor_execute', instrumentation.before_cursor_execute)
+event.listen(Engine, 'after_cursor_execute', instrumentation.after_cursor_execute)
@@ -0,0 +1,264 @@
+import logging
+import random
+import threading
+import traceback
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+from models import Job
+
+logger = logging.getLogger('workout.jobs')
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobQueue:
+    # Database-backed job queue worked by a pool of threads in this process.
+    #
+    # Jobs are rows in the job table. A worker claims one with a conditional
+    # UPDATE and holds it for JOB_LEASE_SECONDS, so several processes can
+    # share the table and a job left 'running' by a crashed process is picked
+    # up again once its lease expires. An expired lease counts as a failed
+    # attempt: once max_attempts is used up the job is marked failed instead
+    # of being reclaimed, so a job that kills its worker cannot loop forever.
+    # Tasks that may run longer than the lease call heartbeat() to renew it.
+    # Failures are retried with exponential backoff until max_attempts. An
+    # idempotency key makes enqueueing the same request twice return the
+    # first job.
+
+    def __init__(self, app=None):
+        self.tasks = {}
+        self._app = None
+        self._threads = []
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._local = threading.local()
+        self.workers = 2
+        self.poll_interval = 1.0
+        self.lease_seconds = 300
+        self.backoff_base = 2.0
+        self.backoff_max = 300.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._app = app
+        self.workers = app.config.get('JOB_WORKERS', 2)
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', 1.0)
+        self.lease_seconds = app.config.get('JOB_LEASE_SECONDS', 300)
+        self.backoff_base = app.config.get('JOB_BACKOFF_BASE', 2.0)
+        self.backoff_max = app.config.get('JOB_BACKOFF_MAX', 300.0)
+        app.extensions['job_queue'] = self
+        app.cli.add_command(run_jobs_command)
+
+    def task(self, name, max_attempts=3):
+        # registers fn(payload) -> JSON-serializable result as a job type
+        def decorator(fn):
+            self.tasks[name] = (fn, max_attempts)
+            return fn
+        return decorator
+
+    def enqueue(self, name, payload=None, user_id=None, idempotency_key=None, delay=0):
+        if name not in self.tasks:
+            raise ValueError(f'Unknown job {name!r}')
+
+        if idempotency_key is not None:
+            existing = Job.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).first()
+            if existing is not None:
+                return existing, False
+
+        now = utcnow()
+        job = Job(
+            name=name,
+            payload=payload or {},
+            status=QUEUED,
+            attempts=0,
+            max_attempts=self.tasks[name][1],
+            run_after=now + timedelta(seconds=delay),
+            idempotency_key=idempotency_key,
+            user_id=user_id,
+            created_at=now,
+            updated_at=now
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # lost a race with the same idempotency key
+            db.session.rollback()
+            return Job.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).one(), False
+
+        # workers start on first use in processes that did not start them
+        # explicitly (e.g. `flask run`)
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+        return job, True
+
+    def start(self, app=None, workers=None):
+        app = app or self._app
+        workers = self.workers if workers is None else workers
+        if self._threads or not workers:
+            return
+        self._stopping.clear()
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker_loop, args=(app,), name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, timeout=None):
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_pending(self, app=None, limit=None):
+        # runs due jobs on the calling thread until none are left; lets tests
+        # and the CLI work the queue without starting the pool
+        app = app or self._app
+        processed = 0
+        while limit is None or processed < limit:
+            with app.app_context():
+                if not self._run_next():
+                    break
+            processed += 1
+        return processed
+
+    def _worker_loop(self, app):
+        while not self._stopping.is_set():
+            try:
+                with app.app_context():
+                    ran = self._run_next()
+            except Exception:
+                logger.exception('Job worker error')
+                ran = False
+            if not ran:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+
+    def heartbeat(self):
+        # renews the lease on the job running on this thread; returns False
+        # if the lease was already lost to another worker, in which case the
+        # task should stop. Written on its own connection so the task's
+        # uncommitted work is left alone.
+        claim = getattr(self._local, 'claim', None)
+        if claim is None:
+            return False
+        job_id, attempts = claim
+        now = utcnow()
+        with db.engine.begin() as connection:
+            renewed = connection.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == RUNNING, Job.attempts == attempts)
+                .values(locked_until=now + timedelta(seconds=self.lease_seconds), updated_at=now)
+            ).rowcount
+        return bool(renewed)
+
+    def _fail_abandoned(self, now):
+        # running jobs whose lease expired on their last attempt
+        abandoned = db.session.execute(
+            update(Job)
+            .where(Job.status == RUNNING, Job.locked_until < now, Job.attempts >= Job.max_attempts)
+            .values(status=FAILED, error='Lease expired on the final attempt', locked_until=None, updated_at=now)
+        ).rowcount
+        db.session.commit()
+        if abandoned:
+            logger.error('Marked %s job(s) failed after their final attempt lost its lease', abandoned)
+
+    def _claim(self):
+        now = utcnow()
+        self._fail_abandoned(now)
+        reclaimable = (Job.status == RUNNING) & (Job.locked_until < now) & (Job.attempts < Job.max_attempts)
+        due = ((Job.status == QUEUED) & (Job.run_after <= now)) | reclaimable
+        candidate_ids = [
+            row.id for row in
+            db.session.query(Job.id).filter(due).order_by(Job.run_after, Job.id).limit(self.workers + 1)
+        ]
+        for job_id in candidate_ids:
+            claimed = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, or_(Job.status == QUEUED, reclaimable))
+                .values(status=RUNNING, attempts=Job.attempts + 1,
+                        locked_until=now + timedelta(seconds=self.lease_seconds), updated_at=now)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return db.session.get(Job, job_id, populate_existing=True)
+        return None
+
+    def _run_next(self):
+        job = self._claim()
+        if job is None:
+            return False
+
+        fn, _ = self.tasks.get(job.name, (None, None))
+        self._local.claim = (job.id, job.attempts)
+        try:
+            if fn is None:
+                raise LookupError(f'No task registered for {job.name!r}')
+            result = fn(dict(job.payload or {}, user_id=job.user_id))
+        except Exception as e:
+            db.session.rollback()
+            self._record_failure(job, e)
+        else:
+            job.status = SUCCEEDED
+            job.result = result
+            job.error = None
+            job.locked_until = None
+            job.updated_at = utcnow()
+            db.session.commit()
+        finally:
+            self._local.claim = None
+        return True
+
+    def _record_failure(self, job, error):
+        job = db.session.get(Job, job.id, populate_existing=True)
+        job.error = ''.join(traceback.format_exception_only(type(error), error)).strip()
+        job.locked_until = None
+        job.updated_at = utcnow()
+        if job.attempts >= job.max_attempts:
+            job.status = FAILED
+            logger.error('Job %s (%s) failed after %s attempts: %s', job.id, job.name, job.attempts, job.error)
+        else:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (job.attempts - 1))
+            job.status = QUEUED
+            job.run_after = utcnow() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+            logger.warning('Job %s (%s) attempt %s failed, retrying in %.1fs: %s',
+                           job.id, job.name, job.attempts, delay, job.error)
+        db.session.commit()
+
+
+job_queue = JobQueue()
+
+
+@click.command('run-jobs')
+@click.option('--forever', is_flag=True, help='keep polling instead of exiting when the queue is empty')
+@with_appcontext
+def run_jobs_command(forever):
+    """Work the background job queue in this process."""
+    from flask import current_app
+
+    app = current_app._get_current_object()
+    if not forever:
+        click.echo(f'Ran {job_queue.run_pending(app)} job(s)')
+        return
+    job_queue.start(app, workers=job_queue.workers or 1)
+    try:
+        for thread in list(job_queue._threads):
+            thread.join()
+    except KeyboardInterrupt:
+        job_queue.shutdown()
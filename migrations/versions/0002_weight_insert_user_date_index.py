@@ -0,0 +1,26 @@
+"""weight_insert (user_id, date_recorded) index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 01:31:02.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('weight_insert', schema=None) as batch_op:
+        batch_op.create_index('ix_weight_insert_user_id_date_recorded', ['user_id', 'date_recorded'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('weight_insert', schema=None) as batch_op:
+        batch_op.drop_index('ix_weight_insert_user_id_date_recorded')
@@ -0,0 +1,34 @@
+"""goal progress columns
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 01:44:10.502913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('goal', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('start_value', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('current_value', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('progress_pct', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_goal_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('goal', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_goal_user_id'))
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('progress_pct')
+        batch_op.drop_column('current_value')
+        batch_op.drop_column('start_value')
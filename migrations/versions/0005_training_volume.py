@@ -0,0 +1,59 @@
+"""training volume rollup
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 03:12:27.684519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('training_volume',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('workout_plan_id', sa.Integer(), nullable=False),
+    sa.Column('plan_created', sa.DateTime(), nullable=False),
+    sa.Column('day_of_week', sa.String(length=10), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.Column('sets', sa.Integer(), nullable=False),
+    sa.Column('reps', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.Column('km', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercise.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['workout_plan_id'], ['workout_plan.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('workout_plan_id', 'day_of_week', 'exercise_id', name='uq_training_volume_plan_day_exercise')
+    )
+    with op.batch_alter_table('training_volume', schema=None) as batch_op:
+        batch_op.create_index('ix_training_volume_user_id_plan_created', ['user_id', 'plan_created'], unique=False)
+
+    # backfill from the existing plans
+    op.execute(
+        "INSERT INTO training_volume "
+        "(user_id, workout_plan_id, plan_created, day_of_week, exercise_id, entries, sets, reps, minutes, km) "
+        "SELECT p.user_id, p.id, p.date_created, d.day_of_week, e.exercise_id, count(e.id), sum(e.sets), "
+        "sum(e.sets * coalesce(e.reps, 0)), sum(e.sets * coalesce(e.duration_min, 0)), "
+        "sum(e.sets * coalesce(e.distance_km, 0.0)) "
+        "FROM workout_plan p "
+        "JOIN daily_session d ON d.workout_plan_id = p.id "
+        "JOIN session_exercise e ON e.daily_session_id = d.id "
+        "GROUP BY p.user_id, p.id, p.date_created, d.day_of_week, e.exercise_id"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('training_volume', schema=None) as batch_op:
+        batch_op.drop_index('ix_training_volume_user_id_plan_created')
+
+    op.drop_table('training_volume')
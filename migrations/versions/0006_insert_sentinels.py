@@ -0,0 +1,32 @@
+"""insert sentinel columns for batched plan inserts
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 04:02:51.339807
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('workout_plan', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('_sentinel', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('daily_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('_sentinel', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('daily_session', schema=None) as batch_op:
+        batch_op.drop_column('_sentinel')
+
+    with op.batch_alter_table('workout_plan', schema=None) as batch_op:
+        batch_op.drop_column('_sentinel')
@@ -1,5 +1,7 @@
 from db import db
 from datetime import datetime, timezone
+from sqlalchemy import case, delete, func, insert, insert_sentinel, tuple_
+from sqlalchemy.orm import selectinload
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -22,24 +24,152 @@ class Exercise(db.Model):
     def __repr__(self):
         return f"Exercise('{self.name}')"
 
+    @classmethod
+    def unknown_ids(cls, exercise_ids):
+        exercise_ids = set(exercise_ids)
+        if not exercise_ids:
+            return set()
+        known = {row.id for row in db.session.query(cls.id).filter(cls.id.in_(exercise_ids))}
+        return exercise_ids - known
+
+    @staticmethod
+    def unknown_ids_message(unknown_ids):
+        return f"Unknown exercise_id {', '.join(map(str, sorted(unknown_ids)))}"
+
+class CatalogVersion(db.Model):
+    # single row counter bumped in the same transaction as any Exercise
+    # write, so every process can tell when its cached catalog is stale
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+    def __repr__(self):
+        return f"CatalogVersion('{self.version}')"
+
 class WorkoutPlan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     goal = db.Column(db.String(200), nullable=False)
     frequency = db.Column(db.String(50), nullable=False)
     duration_min = db.Column(db.Integer, nullable=False)
-    date_created = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    date_created = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     daily_sessions = db.relationship('DailySession', backref='workout_plan', lazy=True)
+    # client-side ordinal that lets INSERT .. RETURNING of many rows run as
+    # one statement on SQLite and still map ids back to their parameters
+    _sentinel = insert_sentinel()
 
     def __repr__(self):
         return f"WorkoutPlan('{self.title}')"
 
+    @classmethod
+    def load_tree(cls, user_id):
+        # plans -> sessions -> session exercises -> exercises via selectin
+        # loading: four queries total, regardless of how many plans, days or
+        # exercises the user has
+        return (
+            cls.query
+            .filter_by(user_id=user_id)
+            .options(
+                selectinload(cls.daily_sessions)
+                .selectinload(DailySession.session_exercises)
+                .selectinload(SessionExercise.exercise)
+            )
+            .order_by(cls.id)
+            .all()
+        )
+
+    @classmethod
+    def bulk_create(cls, user_id, plans_data):
+        # validates every plan up front (one IN query checks the exercise ids
+        # of the whole batch), then writes all valid ones with three
+        # multi-row INSERTs (plans, sessions, session exercises) in the
+        # caller's transaction; invalid plans are reported and skipped
+        parsed = []
+        results = []
+        for index, plan_data in enumerate(plans_data):
+            try:
+                parsed.append((index, *cls._parse_plan(plan_data)))
+            except (KeyError, TypeError, ValueError) as e:
+                results.append({'index': index, 'status': 'failed', 'error': str(e)})
+
+        unknown_ids = Exercise.unknown_ids(
+            exercise_row['exercise_id']
+            for _, _, sessions in parsed
+            for _, exercise_rows in sessions
+            for exercise_row in exercise_rows
+        )
+        valid = []
+        for index, plan_row, sessions in parsed:
+            plan_unknown_ids = unknown_ids.intersection(
+                exercise_row['exercise_id'] for _, exercise_rows in sessions for exercise_row in exercise_rows
+            )
+            if plan_unknown_ids:
+                results.append({'index': index, 'status': 'failed', 'error': Exercise.unknown_ids_message(plan_unknown_ids)})
+                continue
+            plan_row['user_id'] = user_id
+            results.append({'index': index, 'status': 'created'})
+            valid.append((results[-1], plan_row, sessions))
+        results.sort(key=lambda result: result['index'])
+
+        if not valid:
+            return results
+
+        plan_ids = db.session.scalars(
+            insert(cls).returning(cls.id, sort_by_parameter_order=True),
+            [plan_row for _, plan_row, _ in valid]
+        ).all()
+
+        session_rows = []
+        session_exercises = []
+        for plan_id, (result, _, sessions) in zip(plan_ids, valid):
+            result['plan_id'] = plan_id
+            for day_of_week, exercise_rows in sessions:
+                session_rows.append({'day_of_week': day_of_week, 'workout_plan_id': plan_id})
+                session_exercises.append(exercise_rows)
+
+        if session_rows:
+            session_ids = db.session.scalars(
+                insert(DailySession).returning(DailySession.id, sort_by_parameter_order=True),
+                session_rows
+            ).all()
+            exercise_rows = [
+                dict(exercise_row, daily_session_id=session_id)
+                for session_id, rows in zip(session_ids, session_exercises)
+                for exercise_row in rows
+            ]
+            if exercise_rows:
+                db.session.execute(insert(SessionExercise), exercise_rows)
+
+        return results
+
+    @staticmethod
+    def _parse_plan(plan_data):
+        plan_row = {
+            'title': plan_data['title'],
+            'goal': plan_data['goal'],
+            'frequency': plan_data['frequency'],
+            'duration_min': plan_data['duration_min'],
+        }
+        sessions = []
+        for session_data in plan_data['daily_sessions']:
+            exercise_rows = []
+            for exercise_data in session_data['session_exercises']:
+                exercise_rows.append({
+                    'sets': exercise_data['sets'],
+                    'reps': exercise_data.get('reps'),
+                    'duration_min': exercise_data.get('duration_min'),
+                    'distance_km': exercise_data.get('distance_km'),
+                    'exercise_id': exercise_data['exercise_id'],
+                })
+            sessions.append((session_data['day_of_week'], exercise_rows))
+        return plan_row, sessions
+
 class DailySession(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     day_of_week = db.Column(db.String(10), nullable=False)
     workout_plan_id = db.Column(db.Integer, db.ForeignKey('workout_plan.id'), nullable=False)
     session_exercises = db.relationship('SessionExercise', backref='daily_session', lazy=True)
+    _sentinel = insert_sentinel()
 
     def __repr__(self):
         return f"DailySession('{self.day_of_week}')"
@@ -57,21 +187,234 @@ class SessionExercise(db.Model):
     def __repr__(self):
         return f"SessionExercise(Exercise ID: '{self.exercise_id}')"
     
+DAYS_OF_WEEK = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+class TrainingVolume(db.Model):
+    # Weekly training volume of a plan, one row per (plan, day, exercise).
+    # Plans are weekly templates, so these rows are what the user does in a
+    # week when following the plan. Every measure is per set in
+    # SessionExercise and multiplied by `sets` here. Rows are rebuilt for a
+    # plan whenever it is written (see refresh), so reads never walk the tree.
+    __table_args__ = (
+        db.UniqueConstraint('workout_plan_id', 'day_of_week', 'exercise_id',
+                            name='uq_training_volume_plan_day_exercise'),
+        db.Index('ix_training_volume_user_id_plan_created', 'user_id', 'plan_created'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    workout_plan_id = db.Column(db.Integer, db.ForeignKey('workout_plan.id'), nullable=False)
+    plan_created = db.Column(db.DateTime, nullable=False)
+    day_of_week = db.Column(db.String(10), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey('exercise.id'), nullable=False)
+    entries = db.Column(db.Integer, nullable=False)
+    sets = db.Column(db.Integer, nullable=False)
+    reps = db.Column(db.Integer, nullable=False)
+    minutes = db.Column(db.Integer, nullable=False)
+    km = db.Column(db.Float, nullable=False)
+
+    MEASURES = ('entries', 'sets', 'reps', 'minutes', 'km')
+
+    def __repr__(self):
+        return f"TrainingVolume(Plan ID: '{self.workout_plan_id}', '{self.day_of_week}', Exercise ID: '{self.exercise_id}')"
+
+    @classmethod
+    def refresh(cls, plan_ids):
+        # replaces the rollup rows of the given plans with a DELETE and one
+        # INSERT .. SELECT .. GROUP BY in the caller's transaction
+        plan_ids = list(plan_ids)
+        if not plan_ids:
+            return
+        db.session.flush()
+        db.session.execute(delete(cls).where(cls.workout_plan_id.in_(plan_ids)))
+        rollup = (
+            db.select(
+                WorkoutPlan.user_id,
+                WorkoutPlan.id,
+                WorkoutPlan.date_created,
+                DailySession.day_of_week,
+                SessionExercise.exercise_id,
+                func.count(SessionExercise.id),
+                func.sum(SessionExercise.sets),
+                func.sum(SessionExercise.sets * func.coalesce(SessionExercise.reps, 0)),
+                func.sum(SessionExercise.sets * func.coalesce(SessionExercise.duration_min, 0)),
+                func.sum(SessionExercise.sets * func.coalesce(SessionExercise.distance_km, 0.0)),
+            )
+            .join(DailySession, DailySession.workout_plan_id == WorkoutPlan.id)
+            .join(SessionExercise, SessionExercise.daily_session_id == DailySession.id)
+            .where(WorkoutPlan.id.in_(plan_ids))
+            .group_by(WorkoutPlan.user_id, WorkoutPlan.id, WorkoutPlan.date_created,
+                      DailySession.day_of_week, SessionExercise.exercise_id)
+        )
+        db.session.execute(insert(cls).from_select(
+            ['user_id', 'workout_plan_id', 'plan_created', 'day_of_week', 'exercise_id', *cls.MEASURES],
+            rollup
+        ))
+
+    @classmethod
+    def summary(cls, user_id, group_by, plan_id=None, days=None, start=None, end=None):
+        # sums the rollup over any combination of plan, day and exercise for
+        # plans created in [start, end); a single grouped query
+        columns = []
+        grouping = []
+        order = []
+        joins = []
+        if 'plan' in group_by:
+            columns += [cls.workout_plan_id.label('plan_id'), WorkoutPlan.title.label('plan_title')]
+            grouping += [cls.workout_plan_id, WorkoutPlan.title]
+            order.append(cls.workout_plan_id)
+            joins.append((WorkoutPlan, WorkoutPlan.id == cls.workout_plan_id))
+        if 'day' in group_by:
+            columns.append(cls.day_of_week)
+            grouping.append(cls.day_of_week)
+            order += [
+                case({day: position for position, day in enumerate(DAYS_OF_WEEK)},
+                     value=cls.day_of_week, else_=len(DAYS_OF_WEEK)),
+                cls.day_of_week,
+            ]
+        if 'exercise' in group_by:
+            columns += [cls.exercise_id, Exercise.name.label('exercise')]
+            grouping += [cls.exercise_id, Exercise.name]
+            order.append(Exercise.name)
+            joins.append((Exercise, Exercise.id == cls.exercise_id))
+
+        measures = [
+            func.coalesce(func.sum(getattr(cls, measure)), 0).label(measure)
+            for measure in cls.MEASURES
+        ]
+        query = db.session.query(*columns, *measures).select_from(cls)
+        for target, onclause in joins:
+            query = query.join(target, onclause)
+        query = query.filter(cls.user_id == user_id)
+        if plan_id is not None:
+            query = query.filter(cls.workout_plan_id == plan_id)
+        if days:
+            query = query.filter(cls.day_of_week.in_(days))
+        if start is not None:
+            query = query.filter(cls.plan_created >= start)
+        if end is not None:
+            query = query.filter(cls.plan_created < end)
+        if grouping:
+            query = query.group_by(*grouping).order_by(*order)
+        return query.all()
+
 class WeightInsert(db.Model):
+    __table_args__ = (
+        db.Index('ix_weight_insert_user_id_date_recorded', 'user_id', 'date_recorded'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     weight_kg = db.Column(db.Float, nullable=False)
-    date_recorded = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    date_recorded = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
     def __repr__(self):
         return f"WeightInsert('{self.weight_kg}' at '{self.date_recorded}')"
 
+    @classmethod
+    def _in_range(cls, query, user_id, start=None, end=None):
+        query = query.filter(cls.user_id == user_id)
+        if start is not None:
+            query = query.filter(cls.date_recorded >= start)
+        if end is not None:
+            query = query.filter(cls.date_recorded < end)
+        return query
+
+    @classmethod
+    def history_page(cls, user_id, start=None, end=None, after=None, limit=500):
+        # keyset pagination on (date_recorded, id); `after` is the key of the
+        # last row of the previous page. Fetches one extra row to tell whether
+        # another page exists.
+        query = cls._in_range(cls.query, user_id, start, end)
+        if after is not None:
+            query = query.filter(tuple_(cls.date_recorded, cls.id) > tuple_(*after))
+        rows = query.order_by(cls.date_recorded, cls.id).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+
+    @classmethod
+    def bucket_expression(cls, bucket):
+        if db.engine.dialect.name == 'sqlite':
+            if bucket == 'day':
+                return func.date(cls.date_recorded)
+            if bucket == 'week':
+                # Monday of the row's week
+                return func.date(cls.date_recorded, 'weekday 0', '-6 days')
+            return func.strftime('%Y-%m-01', cls.date_recorded)
+        return func.date(func.date_trunc(bucket, cls.date_recorded))
+
+    @classmethod
+    def buckets(cls, user_id, bucket, start=None, end=None):
+        bucket_key = cls.bucket_expression(bucket).label('bucket')
+        position = func.row_number().over(
+            partition_by=bucket_key,
+            order_by=(cls.date_recorded.desc(), cls.id.desc())
+        ).label('position')
+        ranked = cls._in_range(
+            db.session.query(bucket_key, cls.weight_kg, position), user_id, start, end
+        ).subquery()
+        return db.session.query(
+            ranked.c.bucket,
+            func.count().label('count'),
+            func.min(ranked.c.weight_kg).label('min'),
+            func.max(ranked.c.weight_kg).label('max'),
+            func.avg(ranked.c.weight_kg).label('avg'),
+            func.max(case((ranked.c.position == 1, ranked.c.weight_kg))).label('last'),
+        ).group_by(ranked.c.bucket).order_by(ranked.c.bucket).all()
+
 class Goal(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     goal_type = db.Column(db.String(50), nullable=False)
     target_value = db.Column(db.Float, nullable=False)
     is_achieved = db.Column(db.Boolean, nullable=False, default=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    start_value = db.Column(db.Float, nullable=True)
+    current_value = db.Column(db.Float, nullable=True)
+    progress_pct = db.Column(db.Float, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"Goal('{self.goal_type}' - '{self.target_value}')"
+
+class RevokedToken(db.Model):
+    # refresh tokens revoked by /logout, visible to every process; a row is
+    # deleted once its token would have expired anyway
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"RevokedToken('{self.jti}')"
+
+    @classmethod
+    def revoke(cls, jti, expires_at):
+        # in the caller's transaction
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        db.session.execute(delete(cls).where(cls.expires_at <= now))
+        db.session.merge(cls(jti=jti, expires_at=expires_at))
+
+    @classmethod
+    def is_revoked(cls, jti):
+        return db.session.query(cls.jti).filter_by(jti=jti).first() is not None
+
+class Job(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_job_user_id_idempotency_key'),
+        db.Index('ix_job_status_run_after', 'status', 'run_after'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    idempotency_key = db.Column(db.String(100), nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
 
     def __repr__(self):
-        return f"Goal('{self.goal_type}' - '{self.target_value}')"
\ No newline at end of file
+        return f"Job('{self.name}' {self.status})"
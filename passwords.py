@@ -0,0 +1,93 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask_bcrypt import Bcrypt
+
+
+class HasherBusy(Exception):
+    def __init__(self, status_code, retry_after=1):
+        super().__init__('Password hashing is overloaded, try again shortly')
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    # Runs bcrypt on a bounded thread pool (bcrypt releases the GIL while
+    # hashing). At most `workers + queue_size` calls may be in flight; beyond
+    # that callers get HasherBusy(429) immediately, and callers that wait longer
+    # than `timeout` seconds get HasherBusy(503), instead of every request
+    # worker stalling behind the queue.
+    #
+    # Given the number of request threads of the process (gunicorn passes
+    # it), the limit is capped so hashing can occupy at most all but one of
+    # them; other routes keep being served while logins are shed.
+
+    def __init__(self, app=None):
+        self.bcrypt = Bcrypt()
+        self._executor = None
+        self._slots = None
+        self.timeout = None
+        self.workers = None
+        self.queue_size = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, request_threads=None):
+        self.bcrypt.init_app(app)
+        workers = app.config.get('PASSWORD_HASH_WORKERS')
+        queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE')
+        if queue_size is None:
+            queue_size = 32
+        if request_threads:
+            limit = max(1, request_threads - 1)
+            workers = min(workers or 1, limit)
+            queue_size = min(queue_size, limit - workers)
+        else:
+            workers = workers or os.cpu_count() or 1
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 5)
+        self.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        app.extensions['password_hasher'] = self
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    @property
+    def log_rounds(self):
+        return self.bcrypt._log_rounds
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy(429)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HasherBusy(503)
+
+    def hash(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def check(self, pw_hash, password):
+        return self._run(self.bcrypt.check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        # bcrypt hashes look like $2b$<cost>$<salt+digest>
+        try:
+            return int(pw_hash.split('$')[2]) != self.log_rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,203 @@
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.utils import import_string
+
+
+class CacheBackend(ABC):
+    # Storage used by ResponseCache. A shared store (e.g. Redis) can be
+    # plugged in by implementing these four methods; counters must not be
+    # evicted before the entries that were keyed with them. Invalidation is
+    # only seen by processes sharing the backend, so with several workers it
+    # has to be a shared store.
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        pass
+
+    @abstractmethod
+    def get_counter(self, key):
+        pass
+
+    @abstractmethod
+    def incr(self, key):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    # LRU with per-entry TTL and a cap on total body bytes and entry count.
+    # Private to one process: only safe when a single process serves and
+    # writes (development, tests).
+    # Generation counters live in a separate dict so LRU eviction can never
+    # reset them and resurrect stale entries.
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=10000):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, size, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        size = len(value[0]) + len(key) + 64
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class ResponseCache:
+    # Caches successful JSON responses of read endpoints per user, namespace
+    # and query string. Writes call invalidate(user_id, namespace), which bumps
+    # that user's generation so every cached variant is skipped at once.
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 60
+        self.enabled = True
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        backend = app.config.get('RESPONSE_CACHE_BACKEND')
+        if isinstance(backend, str):
+            backend = import_string(backend)()
+        self.backend = backend or MemoryBackend(
+            max_bytes=app.config.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+            max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 10000)
+        )
+        app.extensions['response_cache'] = self
+        instrumentation = app.extensions.get('instrumentation')
+        if instrumentation is not None:
+            instrumentation.add_collector(self.render_metrics)
+
+    def _generation_key(self, user_id, namespace):
+        return f'gen:{namespace}:{user_id}'
+
+    def invalidate(self, user_id, *namespaces):
+        for namespace in namespaces:
+            self.backend.incr(self._generation_key(user_id, namespace))
+        with self._lock:
+            self.invalidations += len(namespaces)
+
+    def cached(self, namespace):
+        # wraps a @jwt_required() view; the identity is the cache partition
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                user_id = get_jwt_identity()
+                generation = self.backend.get_counter(self._generation_key(user_id, namespace))
+                query = '&'.join(sorted(f'{k}={v}' for k, v in request.args.items(multi=True)))
+                key = f'resp:{namespace}:{user_id}:{generation}:{query}'
+
+                cached = self.backend.get(key)
+                if cached is not None:
+                    self._count('hits')
+                    body, headers = cached
+                    response = current_app.response_class(body, mimetype='application/json')
+                    response.headers.extend(headers)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                self._count('misses')
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    extra = [(name, value) for name, value in response.headers.items()
+                             if name.startswith('X-') and name != 'X-Cache']
+                    self.backend.set(key, (response.get_data(), extra), self.ttl)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        stats = {'hits': self.hits, 'misses': self.misses, 'invalidations': self.invalidations}
+        stats.update(self.backend.stats())
+        return stats
+
+    def render_metrics(self):
+        stats = self.stats()
+        lines = []
+        for name, kind, help_text in (
+            ('hits', 'counter', 'Response cache hits.'),
+            ('misses', 'counter', 'Response cache misses.'),
+            ('invalidations', 'counter', 'Response cache invalidations by write routes.'),
+            ('evictions', 'counter', 'Entries evicted to stay under the memory cap.'),
+            ('expirations', 'counter', 'Entries dropped after their TTL.'),
+            ('entries', 'gauge', 'Entries currently cached.'),
+            ('bytes', 'gauge', 'Bytes currently cached.'),
+        ):
+            if name not in stats:
+                continue
+            metric = f'response_cache_{name}' + ('_total' if kind == 'counter' else '')
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}', f'{metric} {stats[name]}']
+        return lines
+
+
+response_cache = ResponseCache()
@@ -1,33 +1,73 @@
-from flask import request, jsonify
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from models import User, Exercise, WorkoutPlan, DailySession, SessionExercise, WeightInsert, Goal
+import base64
+import binascii
+from datetime import datetime
+from itertools import combinations
+
+from flask import request, jsonify, current_app, Response, stream_with_context, url_for
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt, get_jwt_identity
+from marshmallow import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from models import User, Exercise, WorkoutPlan, DailySession, SessionExercise, TrainingVolume, WeightInsert, Goal, Job
 from db import db
 from flask_smorest import Blueprint as SmorestBlueprint
-from schemas import UserSchema, AuthSchema
+from schemas import (
+    UserSchema, AuthSchema, WorkoutPlanSchema, WorkoutPlanBatchSchema, WeightSchema, WeightQuerySchema,
+    GoalSchema, ExerciseQuerySchema, ExerciseSearchQuerySchema, VolumeQuerySchema, ExportQuerySchema, MessageSchema, TokenSchema, ProfileSchema,
+    ExerciseSchema, ExerciseSearchResultSchema, ExerciseTypeaheadSchema, PlanSchema, PlanCreatedSchema, BatchResponseSchema, WeightEntrySchema,
+    WeightBucketSchema, GoalResponseSchema, GoalCreatedSchema, VolumeSchema, JobSchema, workout_plan_schema,
+    VOLUME_GROUPS, VOLUME_GROUP_FIELDS
+)
+from serialization import compile_serializer
+from catalog import exercise_catalog
+from search import exercise_search
+from passwords import password_hasher, HasherBusy
+from goals import apply_weight, start_goal
+from response_cache import response_cache
+from export import EXPORT_FORMATS, generate_export
+from jobs import job_queue
+from auth import identity_cache, revoke_session, user_claims
 
 blp = SmorestBlueprint('blp', __name__, url_prefix="")
-bcrypt = Bcrypt()
+
+dump_plans = compile_serializer(PlanSchema(many=True))
+dump_weight_entries = compile_serializer(WeightEntrySchema(many=True))
+dump_weight_buckets = compile_serializer(WeightBucketSchema(many=True))
+dump_goals = compile_serializer(GoalResponseSchema(many=True))
+dump_job = compile_serializer(JobSchema())
+dump_search_results = compile_serializer(ExerciseSearchResultSchema(many=True))
+dump_typeahead_results = compile_serializer(ExerciseTypeaheadSchema(many=True))
+# summary rows only carry the columns of their groups, so there is one
+# serializer per group_by combination
+dump_volume = {
+    frozenset(groups): compile_serializer(VolumeSchema(
+        many=True,
+        only=[name for group in groups for name in VOLUME_GROUP_FIELDS[group]] + list(TrainingVolume.MEASURES)
+    ))
+    for size in range(len(VOLUME_GROUPS) + 1)
+    for groups in combinations(VOLUME_GROUPS, size)
+}
+
+def _accepted_response(job, created):
+    response = jsonify(dump_job(job))
+    response.headers['Location'] = url_for('blp.get_job', job_id=job.id)
+    return response, 202 if created else 200
+
+def _busy_response(error):
+    response = jsonify({'message': str(error)})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, error.status_code
 
 @blp.route('/register', methods=['POST'])
 @blp.doc(
     summary="Register a new user",
 )
-# @blp.arguments(UserSchema)
-def register():
-    data = request.get_json()
-    username = data.get('username')
-    email = data.get('email')
-    password = data.get('password')
-
-    if not username:
-        return jsonify({'message': 'Username is required'}), 400
-    
-    if not email:
-        return jsonify({'message': 'Email is required'}), 400
-
-    if not password:
-        return jsonify({'message': 'Password is required'}), 400
+@blp.arguments(UserSchema)
+@blp.alt_response(201, schema=MessageSchema, success=True)
+@blp.alt_response(409, schema=MessageSchema)
+def register(data):
+    username = data['username']
+    email = data['email']
+    password = data['password']
 
     username_exists = User.query.filter_by(username=username).first()
     if username_exists:
@@ -37,7 +77,10 @@ def register():
     if email_exists:
         return jsonify({'message': 'Email already exists'}), 409
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    try:
+        hashed_password = password_hasher.hash(password)
+    except HasherBusy as e:
+        return _busy_response(e)
     new_user = User(username=username, email=email, password=hashed_password)
     
     db.session.add(new_user)
@@ -49,58 +92,139 @@ def register():
 @blp.doc(
     summary="Authenticate user",
 )
-# @blp.arguments(AuthSchema)
-def login():
-    data = request.get_json()
-    username = data.get('username')
-    password = data.get('password')
+@blp.arguments(AuthSchema)
+@blp.alt_response(200, schema=TokenSchema, success=True)
+@blp.alt_response(401, schema=MessageSchema)
+def login(data):
+    username = data['username']
+    password = data['password']
 
     user = User.query.filter_by(username=username).first()
 
     if not user:
         return jsonify({'message': 'Invalid username'}), 401
 
-    if not bcrypt.check_password_hash(user.password, password):
+    try:
+        password_ok = password_hasher.check(user.password, password)
+    except HasherBusy as e:
+        return _busy_response(e)
+
+    if not password_ok:
         return jsonify({'message': 'Invalid password'}), 401
-    
-    access_token = create_access_token(identity=str(user.id))
+
+    if password_hasher.needs_rehash(user.password):
+        try:
+            user.password = password_hasher.hash(password)
+            db.session.commit()
+        except HasherBusy:
+            # keep the old hash; the upgrade is retried on the next login
+            pass
+
+    claims = user_claims(user)
+    identity_cache.put(user.id, claims)
+    refresh_token = create_refresh_token(identity=str(user.id))
+    # access tokens name their refresh token so logout can revoke both
+    refresh_jti = decode_token(refresh_token)['jti']
+    access_token = create_access_token(identity=str(user.id), additional_claims=dict(claims, rjti=refresh_jti))
+    return jsonify(access_token=access_token, refresh_token=refresh_token), 200
+
+@blp.route('/refresh', methods=['POST'])
+@blp.doc(
+    summary="Exchange a refresh token for a new access token",
+)
+@blp.alt_response(200, schema=TokenSchema, success=True)
+@jwt_required(refresh=True)
+def refresh():
+    current_user_id = get_jwt_identity()
+    claims = identity_cache.claims_for(current_user_id)
+    if claims is None:
+        return jsonify({'message': 'User no longer exists'}), 401
+
+    access_token = create_access_token(identity=current_user_id, additional_claims=dict(claims, rjti=get_jwt()['jti']))
     return jsonify(access_token=access_token), 200
 
+@blp.route('/logout', methods=['POST'])
+@blp.doc(
+    summary="Log out",
+    description=(
+        "Accepts the access or the refresh token. Revokes it together with the refresh token of "
+        "the same login, so `/refresh` stops issuing access tokens for it."
+    ),
+)
+@blp.alt_response(200, schema=MessageSchema, success=True)
+@jwt_required(verify_type=False)
+def logout():
+    revoke_session(get_jwt())
+    return jsonify({'message': 'Logged out'}), 200
+
 @blp.route('/profile', methods=['GET'])
 @blp.doc(
     summary="Get user profile",
 )
+@blp.alt_response(200, schema=ProfileSchema, success=True)
 @jwt_required()
 def profile():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    return jsonify(logged_in_username=user.username), 200
+    username = get_jwt().get('username')
+    if username is None:
+        # tokens issued before the username claim existed
+        claims = identity_cache.claims_for(get_jwt_identity())
+        username = claims['username'] if claims else None
+
+    return jsonify(logged_in_username=username), 200
 
 @blp.route('/exercises', methods=['GET'])
 @blp.doc(
     summary="Get all exercises",
 )
-def get_exercises():
-    all_exercises = Exercise.query.all()
-    exercises_list = [
-        {
-            'id': exercise.id,
-            'name': exercise.name,
-            'description': exercise.description,
-            'guide': exercise.guide
-        } for exercise in all_exercises
-    ]
-    return jsonify(exercises_list), 200
+@blp.arguments(ExerciseQuerySchema, location='query')
+@blp.alt_response(200, schema=ExerciseSchema(many=True), success=True)
+def get_exercises(args):
+    try:
+        fields = exercise_catalog.parse_fields(args.get('fields'))
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    body, etag = exercise_catalog.get(fields)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={current_app.config['EXERCISE_CATALOG_MAX_AGE']}"
+    return response.make_conditional(request)
+
+@blp.route('/exercises/search', methods=['GET'])
+@blp.doc(
+    summary="Search exercises by name, description and guide",
+    description=(
+        "Ranked full-text search; the last word matches as a prefix. "
+        "Results carry `id`, `name`, `description`, `guide` and `score`. "
+        "With `typeahead=true` each result only carries `id` and `name`."
+    ),
+)
+@blp.arguments(ExerciseSearchQuerySchema, location='query')
+@blp.alt_response(200, schema=ExerciseSearchResultSchema(many=True), success=True)
+def search_exercises(args):
+    results = exercise_search.search(args['q'], args['limit'])
+    if args['typeahead']:
+        return jsonify(dump_typeahead_results(results)), 200
+    return jsonify(dump_search_results(results)), 200
 
 @blp.route('/workout_plans', methods=['POST'])
 @blp.doc(
     summary="Create a new workout plan",
 )
 @jwt_required()
-def create_workout_plan():
+@blp.arguments(WorkoutPlanSchema)
+@blp.alt_response(201, schema=PlanCreatedSchema, success=True)
+@blp.alt_response(400, schema=MessageSchema)
+def create_workout_plan(data):
     current_user_id = get_jwt_identity()
-    data = request.get_json()
+
+    unknown_ids = Exercise.unknown_ids(
+        exercise_data['exercise_id']
+        for session_data in data['daily_sessions']
+        for exercise_data in session_data['session_exercises']
+    )
+    if unknown_ids:
+        return jsonify({'message': Exercise.unknown_ids_message(unknown_ids)}), 400
 
     try:
         new_plan = WorkoutPlan(
@@ -108,88 +232,124 @@ def create_workout_plan():
             goal=data['goal'],
             frequency=data['frequency'],
             duration_min=data['duration_min'],
-            user_id=current_user_id
+            user_id=current_user_id,
+            daily_sessions=[
+                DailySession(
+                    day_of_week=session_data['day_of_week'],
+                    session_exercises=[
+                        SessionExercise(
+                            sets=exercise_data['sets'],
+                            reps=exercise_data.get('reps'),
+                            duration_min=exercise_data.get('duration_min'),
+                            distance_km=exercise_data.get('distance_km'),
+                            exercise_id=exercise_data['exercise_id']
+                        ) for exercise_data in session_data['session_exercises']
+                    ]
+                ) for session_data in data['daily_sessions']
+            ]
         )
         db.session.add(new_plan)
+        db.session.flush()
+        TrainingVolume.refresh([new_plan.id])
         db.session.commit()
+        response_cache.invalidate(current_user_id, 'workout_plans', 'volume')
 
-        for session_data in data['daily_sessions']:
-            new_session = DailySession(
-                day_of_week=session_data['day_of_week'],
-                workout_plan_id=new_plan.id
-            )
-            db.session.add(new_session)
-            db.session.commit()
+        return jsonify({"message": "Workout plan created successfully!", "plan_id": new_plan.id}), 201
 
-            for exercise_data in session_data['session_exercises']:
-                new_session_exercise = SessionExercise(
-                    sets=exercise_data['sets'],
-                    reps=exercise_data.get('reps'),
-                    duration_min=exercise_data.get('duration_min'),
-                    distance_km=exercise_data.get('distance_km'),
-                    daily_session_id=new_session.id,
-                    exercise_id=exercise_data['exercise_id']
-                )
-                db.session.add(new_session_exercise)
-        
-        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception('Failed to create workout plan')
+        return jsonify({"message": "Failed to create workout plan"}), 400
 
-        return jsonify({"message": "Workout plan created successfully!", "plan_id": new_plan.id}), 201
+@blp.route('/workout_plans/batch', methods=['POST'])
+@blp.doc(
+    summary="Create many workout plans at once",
+)
+@jwt_required()
+@blp.arguments(WorkoutPlanBatchSchema)
+@blp.alt_response(201, schema=BatchResponseSchema, success=True)
+@blp.alt_response(207, schema=BatchResponseSchema)
+def create_workout_plans_batch(data):
+    current_user_id = get_jwt_identity()
 
-    except Exception as e:
+    results = [None] * len(data['plans'])
+    valid_indexes = []
+    valid_plans = []
+    for index, plan_data in enumerate(data['plans']):
+        try:
+            valid_plans.append(workout_plan_schema.load(plan_data))
+            valid_indexes.append(index)
+        except ValidationError as e:
+            results[index] = {'index': index, 'status': 'failed', 'error': e.messages}
+
+    try:
+        for index, result in zip(valid_indexes, WorkoutPlan.bulk_create(current_user_id, valid_plans)):
+            results[index] = dict(result, index=index)
+        TrainingVolume.refresh(result['plan_id'] for result in results if result['status'] == 'created')
+        db.session.commit()
+        response_cache.invalidate(current_user_id, 'workout_plans', 'volume')
+    except SQLAlchemyError:
         db.session.rollback()
-        return jsonify({"error": str(e), "message": "Failed to create workout plan"}), 400
+        current_app.logger.exception('Failed to create workout plans')
+        return jsonify({"message": "Failed to create workout plans"}), 400
+
+    created = sum(1 for result in results if result['status'] == 'created')
+    if created == len(results):
+        status_code = 201
+    elif created:
+        status_code = 207
+    else:
+        status_code = 400
+    return jsonify({"created": created, "failed": len(results) - created, "results": results}), status_code
 
 @blp.route('/workout_plans', methods=['GET'])
 @blp.doc(
     summary="Get all user workout plans",
 )
+@blp.alt_response(200, schema=PlanSchema(many=True), success=True)
 @jwt_required()
+@response_cache.cached('workout_plans')
 def get_workout_plans():
     current_user_id = get_jwt_identity()
-    plans = WorkoutPlan.query.filter_by(user_id=current_user_id).all()
-
-    plans_list = []
-    for plan in plans:
-        plan_data = {
-            'id': plan.id,
-            'title': plan.title,
-            'goal': plan.goal,
-            'frequency': plan.frequency,
-            'duration_min': plan.duration_min,
-            'date_created': plan.date_created.isoformat(),
-            'daily_sessions': []
-        }
-        for session in plan.daily_sessions:
-            session_data = {
-                'id': session.id,
-                'day_of_week': session.day_of_week,
-                'exercises': []
-            }
-            for session_ex in session.session_exercises:
-                exercise_details = Exercise.query.get(session_ex.exercise_id)
-                session_exercise_data = {
-                    'sets': session_ex.sets,
-                    'reps': session_ex.reps,
-                    'duration_min': session_ex.duration_min,
-                    'distance_km': session_ex.distance_km,
-                    'exercise_name': exercise_details.name,
-                    'exercise_description': exercise_details.description,
-                    'exercise_guide': exercise_details.guide
-                }
-                session_data['exercises'].append(session_exercise_data)
-            plan_data['daily_sessions'].append(session_data)
-        plans_list.append(plan_data)
-    return jsonify(plans_list), 200
+    plans = WorkoutPlan.load_tree(current_user_id)
+    return jsonify(dump_plans(plans)), 200
+
+@blp.route('/stats/volume', methods=['GET'])
+@blp.doc(
+    summary="Get weekly training volume",
+    description=(
+        "Sums entries, sets, reps (sets x reps), minutes (sets x duration) and km (sets x distance) "
+        "from the precomputed per plan/day/exercise rollup. `group_by` takes any comma-separated "
+        "combination of `plan`, `day` and `exercise` (default `exercise`; empty for a single total). "
+        "`plan_id`, `days` and `from`/`to` (plan creation time) narrow the rows summed."
+    ),
+)
+@jwt_required()
+@blp.arguments(VolumeQuerySchema, location='query')
+@blp.alt_response(200, schema=VolumeSchema(many=True), success=True)
+@response_cache.cached('volume')
+def get_training_volume(args):
+    current_user_id = get_jwt_identity()
+    group_by = frozenset(args['group_by'])
+    rows = TrainingVolume.summary(
+        current_user_id,
+        group_by,
+        plan_id=args.get('plan_id'),
+        days=args.get('days'),
+        start=args.get('start'),
+        end=args.get('end')
+    )
+    return jsonify(dump_volume[group_by](rows)), 200
 
 @blp.route('/weight', methods=['POST'])
 @blp.doc(
     summary="Add a new weight entry",
 )
 @jwt_required()
-def add_weight():
+@blp.arguments(WeightSchema)
+@blp.alt_response(201, schema=MessageSchema, success=True)
+def add_weight(data):
     current_user_id = get_jwt_identity()
-    data = request.get_json()
 
     try:
         new_weight_entry = WeightInsert(
@@ -197,36 +357,67 @@ def add_weight():
             user_id=current_user_id
         )
         db.session.add(new_weight_entry)
+        apply_weight(current_user_id, new_weight_entry.weight_kg)
         db.session.commit()
+        response_cache.invalidate(current_user_id, 'weight', 'goals')
         return jsonify({"message": "Weight entry added successfully!"}), 201
-    except Exception as e:
-        return jsonify({"error": str(e), "message": "Failed to add weight entry"}), 400
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception('Failed to add weight entry')
+        return jsonify({"message": "Failed to add weight entry"}), 400
+
+def _encode_cursor(entry):
+    raw = f"{entry.date_recorded.isoformat()}|{entry.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    date_recorded, entry_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(date_recorded), int(entry_id)
 
 @blp.route('/weight', methods=['GET'])
 @blp.doc(
     summary="Get user's weight",
+    description=(
+        "Entries ordered by date_recorded. Optional `from` (inclusive) and `to` "
+        "(exclusive) ISO-8601 filters. Pages of `limit` entries; when more exist "
+        "the `X-Next-Cursor` header holds the value to pass as `cursor`. With "
+        "`bucket=day|week|month` returns count/min/max/avg/last per bucket instead."
+    ),
 )
 @jwt_required()
-def get_weight_history():
+@blp.arguments(WeightQuerySchema, location='query')
+@blp.alt_response(200, schema=WeightEntrySchema(many=True), success=True)
+@response_cache.cached('weight')
+def get_weight_history(args):
     current_user_id = get_jwt_identity()
-    weight_entries = WeightInsert.query.filter_by(user_id=current_user_id).order_by(WeightInsert.date_recorded.asc()).all()
-    history = [
-        {
-            'id': entry.id,
-            'weight_kg': entry.weight_kg,
-            'date_recorded': entry.date_recorded.isoformat()
-        } for entry in weight_entries
-    ]
-    return jsonify(history), 200
+    start = args.get('start')
+    end = args.get('end')
+
+    if args.get('bucket'):
+        rows = WeightInsert.buckets(current_user_id, args['bucket'], start, end)
+        return jsonify(dump_weight_buckets(rows)), 200
+
+    try:
+        after = _decode_cursor(args['cursor']) if args.get('cursor') else None
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return jsonify({'message': 'Invalid cursor'}), 400
+
+    weight_entries, has_more = WeightInsert.history_page(current_user_id, start, end, after, args['limit'])
+    response = jsonify(dump_weight_entries(weight_entries))
+    if has_more:
+        response.headers['X-Next-Cursor'] = _encode_cursor(weight_entries[-1])
+    return response, 200
 
 @blp.route('/goals', methods=['POST'])
 @blp.doc(
     summary="Set a new goal",
 )
 @jwt_required()
-def set_goal():
+@blp.arguments(GoalSchema)
+@blp.alt_response(201, schema=GoalCreatedSchema, success=True)
+def set_goal(data):
     current_user_id = get_jwt_identity()
-    data = request.get_json()
 
     try:
         new_goal = Goal(
@@ -234,26 +425,85 @@ def set_goal():
             target_value=data['target_value'],
             user_id=current_user_id
         )
+        start_goal(new_goal)
         db.session.add(new_goal)
         db.session.commit()
-        return jsonify({"message": "Goal set successfully!"}), 201
-    except Exception as e:
-        return jsonify({"error": str(e), "message": "Failed to set goal"}), 400
+        response_cache.invalidate(current_user_id, 'goals')
+        return jsonify({"message": "Goal set successfully!", "goal_id": new_goal.id}), 201
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception('Failed to set goal')
+        return jsonify({"message": "Failed to set goal"}), 400
 
 @blp.route('/goals', methods=['GET'])
 @blp.doc(
     summary="Get all user goals",
 )
+@blp.alt_response(200, schema=GoalResponseSchema(many=True), success=True)
 @jwt_required()
+@response_cache.cached('goals')
 def get_goals():
     current_user_id = get_jwt_identity()
     goals = Goal.query.filter_by(user_id=current_user_id).all()
-    goals_list = [
-        {
-            'id': goal.id,
-            'goal_type': goal.goal_type,
-            'target_value': goal.target_value,
-            'is_achieved': goal.is_achieved
-        } for goal in goals
-    ]
-    return jsonify(goals_list), 200
\ No newline at end of file
+    return jsonify(dump_goals(goals)), 200
+
+@blp.route('/goals/recompute', methods=['POST'])
+@blp.doc(
+    summary="Recompute goal progress in the background",
+    description=(
+        "Queues a job that re-evaluates every open weight goal against the latest weight entry "
+        "and returns it with 202; poll the `Location` URL for the outcome. Resending the same "
+        "`Idempotency-Key` header returns the original job with 200 instead of queueing another."
+    ),
+)
+@jwt_required()
+@blp.alt_response(202, schema=JobSchema, success=True)
+@blp.alt_response(200, schema=JobSchema, description="Idempotency-Key already used")
+@blp.alt_response(400, schema=MessageSchema)
+def recompute_goals():
+    current_user_id = get_jwt_identity()
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= 100:
+        return jsonify({'message': 'Idempotency-Key must be 1-100 characters'}), 400
+
+    job, created = job_queue.enqueue('recompute_goals', user_id=current_user_id, idempotency_key=idempotency_key)
+    return _accepted_response(job, created)
+
+@blp.route('/jobs/<int:job_id>', methods=['GET'])
+@blp.doc(
+    summary="Get the status of a background job",
+)
+@jwt_required()
+@blp.alt_response(200, schema=JobSchema, success=True)
+@blp.alt_response(404, schema=MessageSchema)
+def get_job(job_id):
+    current_user_id = get_jwt_identity()
+    job = Job.query.filter_by(id=job_id, user_id=current_user_id).first()
+    if job is None:
+        return jsonify({'message': 'Job not found'}), 404
+    response = jsonify(dump_job(job))
+    response.headers['Cache-Control'] = 'no-store'
+    return response, 200
+
+@blp.route('/export', methods=['GET'])
+@blp.doc(
+    summary="Export all of the user's training and weight data",
+    description=(
+        "Streams plans, sessions, session exercises, weight entries and goals. "
+        "`format=ndjson` (default) emits one JSON object per line with a `type` field; "
+        "`format=csv` emits a single table with a `record_type` column."
+    ),
+)
+@jwt_required()
+@blp.arguments(ExportQuerySchema, location='query')
+def export_data(args):
+    current_user_id = get_jwt_identity()
+    export_format = args['format']
+
+    response = Response(
+        stream_with_context(generate_export(current_user_id, export_format)),
+        mimetype=EXPORT_FORMATS[export_format]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="workout-export.{export_format}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -1,10 +1,197 @@
-from marshmallow import Schema, fields
+from datetime import timezone
+
+from marshmallow import Schema, fields, validate
+from webargs.fields import DelimitedList
+
+from export import EXPORT_FORMATS
+
+WEIGHT_BUCKETS = ('day', 'week', 'month')
+WEIGHT_PAGE_DEFAULT = 500
+WEIGHT_PAGE_MAX = 5000
+VOLUME_GROUPS = ('plan', 'day', 'exercise')
+# VolumeSchema fields each group_by value adds to a row
+VOLUME_GROUP_FIELDS = {
+    'plan': ('plan_id', 'plan_title'),
+    'day': ('day_of_week',),
+    'exercise': ('exercise_id', 'exercise'),
+}
+
+# request bodies and query strings
 
 class UserSchema(Schema):
-    username = fields.Str(required=True)
-    email = fields.Email(required=True)
-    password = fields.Str(required=True)
+    username = fields.Str(required=True, validate=validate.Length(min=1, max=20))
+    email = fields.Email(required=True, validate=validate.Length(max=120))
+    password = fields.Str(required=True, validate=validate.Length(min=1))
 
 class AuthSchema(Schema):
     username = fields.Str(required=True)
-    password = fields.Str(required=True)
\ No newline at end of file
+    password = fields.Str(required=True)
+
+class SessionExerciseSchema(Schema):
+    sets = fields.Int(required=True, validate=validate.Range(min=1))
+    reps = fields.Int(allow_none=True, validate=validate.Range(min=0))
+    duration_min = fields.Int(allow_none=True, validate=validate.Range(min=0))
+    distance_km = fields.Float(allow_none=True, validate=validate.Range(min=0))
+    exercise_id = fields.Int(required=True)
+
+class DailySessionSchema(Schema):
+    day_of_week = fields.Str(required=True, validate=validate.Length(min=1, max=10))
+    session_exercises = fields.List(fields.Nested(SessionExerciseSchema), required=True)
+
+class WorkoutPlanSchema(Schema):
+    title = fields.Str(required=True, validate=validate.Length(min=1, max=100))
+    goal = fields.Str(required=True, validate=validate.Length(max=200))
+    frequency = fields.Str(required=True, validate=validate.Length(max=50))
+    duration_min = fields.Int(required=True, validate=validate.Range(min=1))
+    daily_sessions = fields.List(fields.Nested(DailySessionSchema), required=True)
+
+class WorkoutPlanBatchSchema(Schema):
+    # plans are validated one by one so failures can be reported per plan
+    plans = fields.List(fields.Dict(), required=True, validate=validate.Length(min=1))
+
+class WeightSchema(Schema):
+    weight_kg = fields.Float(required=True, validate=validate.Range(min=0, min_inclusive=False))
+
+class WeightQuerySchema(Schema):
+    start = fields.NaiveDateTime(data_key='from', timezone=timezone.utc)
+    end = fields.NaiveDateTime(data_key='to', timezone=timezone.utc)
+    limit = fields.Int(load_default=WEIGHT_PAGE_DEFAULT, validate=validate.Range(min=1, max=WEIGHT_PAGE_MAX))
+    cursor = fields.Str()
+    bucket = fields.Str(validate=validate.OneOf(WEIGHT_BUCKETS))
+
+class GoalSchema(Schema):
+    goal_type = fields.Str(required=True, validate=validate.Length(min=1, max=50))
+    target_value = fields.Float(required=True)
+
+class ExerciseQuerySchema(Schema):
+    fields = fields.Str()
+
+class ExerciseSearchQuerySchema(Schema):
+    q = fields.Str(required=True, validate=validate.Length(min=1, max=100))
+    limit = fields.Int(load_default=10, validate=validate.Range(min=1, max=50))
+    typeahead = fields.Bool(load_default=False)
+
+class VolumeQuerySchema(Schema):
+    group_by = DelimitedList(fields.Str(validate=validate.OneOf(VOLUME_GROUPS)), load_default=['exercise'])
+    plan_id = fields.Int()
+    days = DelimitedList(fields.Str(validate=validate.Length(min=1, max=10)))
+    start = fields.NaiveDateTime(data_key='from', timezone=timezone.utc)
+    end = fields.NaiveDateTime(data_key='to', timezone=timezone.utc)
+
+class ExportQuerySchema(Schema):
+    format = fields.Str(load_default='ndjson', validate=validate.OneOf(list(EXPORT_FORMATS)))
+
+# responses
+
+class MessageSchema(Schema):
+    message = fields.Str()
+
+class TokenSchema(Schema):
+    access_token = fields.Str()
+    refresh_token = fields.Str()
+
+class ProfileSchema(Schema):
+    logged_in_username = fields.Str()
+
+class ExerciseSchema(Schema):
+    id = fields.Int()
+    name = fields.Str()
+    description = fields.Str()
+    guide = fields.Str()
+
+class ExerciseSearchResultSchema(ExerciseSchema):
+    score = fields.Float()
+
+class ExerciseTypeaheadSchema(Schema):
+    id = fields.Int()
+    name = fields.Str()
+
+class PlanExerciseSchema(Schema):
+    sets = fields.Int()
+    reps = fields.Int(allow_none=True)
+    duration_min = fields.Int(allow_none=True)
+    distance_km = fields.Float(allow_none=True)
+    exercise_name = fields.Str(attribute='exercise.name')
+    exercise_description = fields.Str(attribute='exercise.description')
+    exercise_guide = fields.Str(attribute='exercise.guide')
+
+class PlanSessionSchema(Schema):
+    id = fields.Int()
+    day_of_week = fields.Str()
+    exercises = fields.List(fields.Nested(PlanExerciseSchema), attribute='session_exercises')
+
+class PlanSchema(Schema):
+    id = fields.Int()
+    title = fields.Str()
+    goal = fields.Str()
+    frequency = fields.Str()
+    duration_min = fields.Int()
+    date_created = fields.DateTime()
+    daily_sessions = fields.List(fields.Nested(PlanSessionSchema))
+
+class PlanCreatedSchema(MessageSchema):
+    plan_id = fields.Int()
+
+class BatchResultSchema(Schema):
+    index = fields.Int()
+    status = fields.Str()
+    plan_id = fields.Int()
+    error = fields.Raw()
+
+class BatchResponseSchema(Schema):
+    created = fields.Int()
+    failed = fields.Int()
+    results = fields.List(fields.Nested(BatchResultSchema))
+
+class WeightEntrySchema(Schema):
+    id = fields.Int()
+    weight_kg = fields.Float()
+    date_recorded = fields.DateTime()
+
+class WeightBucketSchema(Schema):
+    bucket = fields.Str()
+    count = fields.Int()
+    min = fields.Float()
+    max = fields.Float()
+    avg = fields.Float()
+    last = fields.Float()
+
+class GoalResponseSchema(Schema):
+    id = fields.Int()
+    goal_type = fields.Str()
+    target_value = fields.Float()
+    is_achieved = fields.Bool()
+    progress_pct = fields.Float(allow_none=True)
+    start_value = fields.Float(allow_none=True)
+    current_value = fields.Float(allow_none=True)
+    updated_at = fields.DateTime(allow_none=True)
+
+class GoalCreatedSchema(MessageSchema):
+    goal_id = fields.Int()
+
+class VolumeSchema(Schema):
+    plan_id = fields.Int()
+    plan_title = fields.Str()
+    day_of_week = fields.Str()
+    exercise_id = fields.Int()
+    exercise = fields.Str()
+    entries = fields.Int()
+    sets = fields.Int()
+    reps = fields.Int()
+    minutes = fields.Int()
+    km = fields.Float()
+
+class JobSchema(Schema):
+    id = fields.Int()
+    name = fields.Str()
+    status = fields.Str()
+    attempts = fields.Int()
+    max_attempts = fields.Int()
+    run_after = fields.DateTime()
+    result = fields.Raw(allow_none=True)
+    error = fields.Str(allow_none=True)
+    created_at = fields.DateTime()
+    updated_at = fields.DateTime()
+
+# shared instances; building a schema is far more expensive than using one
+workout_plan_schema = WorkoutPlanSchema()
@@ -0,0 +1,125 @@
+import bisect
+import math
+import re
+import threading
+from collections import defaultdict, namedtuple
+
+from catalog import exercise_catalog
+from db import db
+from models import Exercise
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+FIELD_WEIGHTS = (('name', 3.0), ('description', 1.0), ('guide', 0.5))
+PREFIX_PENALTY = 0.7
+NAME_PREFIX_BOOST = 5.0
+
+# everything a search reads, built by rebuild() and published with a single
+# attribute assignment so concurrent searches never see a half-built index
+IndexSnapshot = namedtuple('IndexSnapshot', 'version postings vocabulary documents')
+SearchDocument = namedtuple('SearchDocument', 'id name description guide name_key')
+SearchResult = namedtuple('SearchResult', 'id name description guide score')
+
+
+def tokenize(text):
+    tokens = TOKEN_RE.findall(text.lower())
+    # "Pull-up" also indexes as "pullup" so both spellings match
+    joined = [''.join(pair) for pair in re.findall(r'([a-z0-9]+)-([a-z0-9]+)', text.lower())]
+    return tokens + joined
+
+
+def _compact(text):
+    # "Pull-up", "pull up" and "pullup" all compare equal
+    return ''.join(TOKEN_RE.findall(text.lower()))
+
+
+class ExerciseSearchIndex:
+    # Inverted index over exercise name/description/guide with field-weighted
+    # tf-idf scores. The vocabulary is kept sorted so a prefix lookup is two
+    # bisects. The index is rebuilt on first use after the catalog version
+    # changes, i.e. after any committed Exercise write in any process. The
+    # lock only serializes rebuilds; searches read the current snapshot
+    # without it.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = IndexSnapshot(None, {}, [], {})
+
+    def _ensure_current(self):
+        # returns the snapshot the caller should search
+        exercise_catalog.sync()
+        snapshot = self._snapshot
+        if snapshot.version == exercise_catalog.version:
+            return snapshot
+        with self._lock:
+            if self._snapshot.version != exercise_catalog.version:
+                self.rebuild()
+            return self._snapshot
+
+    def rebuild(self):
+        version = exercise_catalog.version
+        rows = db.session.query(Exercise.id, Exercise.name, Exercise.description, Exercise.guide).all()
+
+        weights = defaultdict(lambda: defaultdict(float))
+        documents = {}
+        for row in rows:
+            documents[row.id] = SearchDocument(row.id, row.name, row.description, row.guide, _compact(row.name))
+            for field, field_weight in FIELD_WEIGHTS:
+                for token in tokenize(getattr(row, field)):
+                    weights[token][row.id] += field_weight
+
+        total = max(len(documents), 1)
+        postings = {}
+        for token, docs in weights.items():
+            idf = math.log(1 + total / len(docs))
+            # dampen repeated terms so long guides do not dominate
+            postings[token] = {doc_id: (1 + math.log(weight)) * idf if weight >= 1 else weight * idf
+                               for doc_id, weight in docs.items()}
+
+        self._snapshot = IndexSnapshot(version, postings, sorted(postings), documents)
+
+    @staticmethod
+    def _expand(snapshot, token, prefix):
+        # postings for the exact token and, if prefix matching, every longer
+        # term starting with it (scored a little lower than exact matches)
+        matches = {}
+        exact = snapshot.postings.get(token)
+        if exact:
+            matches.update(exact)
+        if prefix:
+            start = bisect.bisect_left(snapshot.vocabulary, token)
+            end = bisect.bisect_left(snapshot.vocabulary, token + '\uffff')
+            for term in snapshot.vocabulary[start:end]:
+                if term == token:
+                    continue
+                for doc_id, score in snapshot.postings[term].items():
+                    matches[doc_id] = max(matches.get(doc_id, 0.0), score * PREFIX_PENALTY)
+        return matches
+
+    def search(self, query, limit=10):
+        snapshot = self._ensure_current()
+        documents = snapshot.documents
+        tokens = TOKEN_RE.findall(query.lower())
+        if not tokens:
+            return []
+
+        scores = None
+        for i, token in enumerate(tokens):
+            # every word must match; only the word being typed is a prefix
+            matches = self._expand(snapshot, token, prefix=(i == len(tokens) - 1))
+            if scores is None:
+                scores = matches
+            else:
+                scores = {doc_id: scores[doc_id] + score for doc_id, score in matches.items() if doc_id in scores}
+            if not scores:
+                return []
+
+        query_key = ''.join(tokens)
+        for doc_id in scores:
+            if documents[doc_id].name_key.startswith(query_key):
+                scores[doc_id] += NAME_PREFIX_BOOST
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], documents[item[0]].name))
+        return [SearchResult(*documents[doc_id][:4], round(score, 4)) for doc_id, score in ranked[:limit]]
+
+
+exercise_search = ExerciseSearchIndex()
@@ -1,4 +1,5 @@
-from app import app, db
+from app import create_app
+from db import db, upgrade_database
 from models import Exercise
 
 exercises_data = [
@@ -34,11 +35,22 @@ exercises_data = [
     {"name": "L-sit", "description": "An advanced core exercise that builds incredible abdominal strength and hip flexor endurance.", "guide": "Sit on the floor with your legs straight out. Place your hands on the floor next to your hips. Press down with your hands to lift your hips and legs off the floor, holding your legs straight out in front of you."}
 ]
 
-with app.app_context():
-    db.drop_all()
-    db.create_all()
+def seed_exercises():
+    existing = {exercise.name: exercise for exercise in Exercise.query.all()}
     for exercise_data in exercises_data:
-        exercise = Exercise(**exercise_data)
-        db.session.add(exercise)
+        exercise = existing.get(exercise_data['name'])
+        if exercise is None:
+            db.session.add(Exercise(**exercise_data))
+        else:
+            exercise.description = exercise_data['description']
+            exercise.guide = exercise_data['guide']
     db.session.commit()
-    print("Database seeded!")
\ No newline at end of file
+
+
+if __name__ == '__main__':
+    app = create_app()
+
+    with app.app_context():
+        upgrade_database()
+        seed_exercises()
+        print("Database seeded!")
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from db import db
+from seed import seed_exercises
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed_exercises()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    # registers and logs in a user, returning the login response body
+    def register(username='alice', password='password'):
+        client.post('/register', json={'username': username, 'email': f'{username}@example.com', 'password': password})
+        return client.post('/login', json={'username': username, 'password': password}).get_json()
+    return register
+
+
+@pytest.fixture
+def auth_headers(register):
+    tokens = register()
+    return {'Authorization': f"Bearer {tokens['access_token']}"}
+
+
+def make_plan(sessions=1, exercises=1, title='Plan'):
+    days = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+    return {
+        'title': title,
+        'goal': 'General fitness',
+        'frequency': f'{sessions}x per week',
+        'duration_min': 45,
+        'daily_sessions': [
+            {
+                'day_of_week': days[s % len(days)],
+                'session_exercises': [
+                    {'exercise_id': e + 1, 'sets': 3, 'reps': 10} for e in range(exercises)
+                ],
+            }
+            for s in range(sessions)
+        ],
+    }
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import auth
+from auth import TokenBlocklist
+from db import db
+from models import RevokedToken
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_refresh_issues_access_token(client, register):
+    tokens = register()
+
+    response = client.post('/refresh', headers=bearer(tokens['refresh_token']))
+
+    assert response.status_code == 200
+    assert client.get('/profile', headers=bearer(response.get_json()['access_token'])).status_code == 200
+
+
+def test_logout_with_access_token_ends_the_session(client, register):
+    tokens = register()
+
+    assert client.post('/logout', headers=bearer(tokens['access_token'])).status_code == 200
+
+    assert client.get('/profile', headers=bearer(tokens['access_token'])).status_code == 401
+    assert client.post('/refresh', headers=bearer(tokens['refresh_token'])).status_code == 401
+
+
+def test_logout_with_refresh_token(client, register):
+    tokens = register()
+    refreshed = client.post('/refresh', headers=bearer(tokens['refresh_token'])).get_json()['access_token']
+
+    assert client.post('/logout', headers=bearer(tokens['refresh_token'])).status_code == 200
+
+    assert client.post('/refresh', headers=bearer(tokens['refresh_token'])).status_code == 401
+    assert client.get('/profile', headers=bearer(refreshed)).status_code == 401
+
+
+def test_refresh_revocation_is_shared_between_processes(client, register, monkeypatch):
+    tokens = register()
+    client.post('/logout', headers=bearer(tokens['access_token']))
+
+    # another worker has an empty in-memory blocklist
+    monkeypatch.setattr(auth, 'blocklist', TokenBlocklist())
+
+    assert client.post('/refresh', headers=bearer(tokens['refresh_token'])).status_code == 401
+
+
+def test_other_logins_stay_valid(client, register):
+    first = register()
+    second = client.post('/login', json={'username': 'alice', 'password': 'password'}).get_json()
+
+    client.post('/logout', headers=bearer(first['access_token']))
+
+    assert client.get('/profile', headers=bearer(second['access_token'])).status_code == 200
+    assert client.post('/refresh', headers=bearer(second['refresh_token'])).status_code == 200
+
+
+def test_expired_revocations_are_purged(app):
+    RevokedToken.revoke('old', datetime(2000, 1, 1))
+    db.session.commit()
+    RevokedToken.revoke('new', datetime.now() + timedelta(days=1))
+    db.session.commit()
+
+    assert not RevokedToken.is_revoked('old')
+    assert RevokedToken.is_revoked('new')
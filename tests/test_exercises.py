@@ -0,0 +1,57 @@
+from sqlalchemy import update
+
+from catalog import exercise_catalog
+from db import db
+from models import CatalogVersion, Exercise
+from seed import seed_exercises
+
+
+def test_exercises_etag(client):
+    response = client.get('/exercises?fields=id,name')
+    assert response.status_code == 200
+    assert set(response.get_json()[0]) == {'id', 'name'}
+
+    cached = client.get('/exercises?fields=id,name', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+
+
+def test_catalog_refreshes_after_commit(client):
+    before = client.get('/exercises?fields=name').headers['ETag']
+
+    exercise = db.session.get(Exercise, 1)
+    exercise.name = 'Hip Bridge'
+    db.session.flush()
+    # not committed yet: the cached body stays as it was
+    assert client.get('/exercises?fields=name').headers['ETag'] == before
+    db.session.commit()
+
+    response = client.get('/exercises?fields=name')
+    assert response.headers['ETag'] != before
+    assert response.get_json()[0]['name'] == 'Hip Bridge'
+    assert client.get('/exercises/search?q=hip').get_json()[0]['name'] == 'Hip Bridge'
+
+
+def test_catalog_picks_up_writes_from_other_processes(client):
+    exercise_catalog.check_interval = 0
+    client.get('/exercises/search?q=bridge')
+    before = client.get('/exercises?fields=name').get_json()
+
+    # what another worker or seed.py leaves behind: new rows and a bumped version
+    with db.engine.begin() as connection:
+        connection.execute(update(Exercise).where(Exercise.id == 1).values(name='Hip Bridge'))
+        connection.execute(update(CatalogVersion).values(version=CatalogVersion.version + 1))
+
+    after = client.get('/exercises?fields=name').get_json()
+    assert before[0]['name'] == 'Bridge'
+    assert after[0]['name'] == 'Hip Bridge'
+    assert client.get('/exercises/search?q=hip').get_json()[0]['name'] == 'Hip Bridge'
+
+
+def test_seed_bumps_catalog_version(app):
+    version = db.session.query(CatalogVersion.version).scalar()
+    db.session.get(Exercise, 1).description = 'changed'
+    db.session.commit()
+
+    seed_exercises()
+
+    assert db.session.query(CatalogVersion.version).scalar() == version + 2
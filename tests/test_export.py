@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+from conftest import make_plan
+
+
+def seed_user_data(client, headers, title='Plan'):
+    assert client.post('/workout_plans', json=make_plan(sessions=2, exercises=2, title=title),
+                       headers=headers).status_code == 201
+    assert client.post('/weight', json={'weight_kg': 80}, headers=headers).status_code == 201
+    assert client.post('/goals', json={'goal_type': 'weight_loss', 'target_value': 75},
+                       headers=headers).status_code == 201
+
+
+def test_ndjson_export_records(client, auth_headers):
+    seed_user_data(client, auth_headers)
+
+    response = client.get('/export', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record['type'] for record in records] == (
+        ['plan'] + ['session'] * 2 + ['session_exercise'] * 4 + ['weight', 'goal']
+    )
+    plan = records[0]
+    assert (plan['title'], plan['duration_min']) == ('Plan', 45)
+    session_ids = {record['id'] for record in records if record['type'] == 'session'}
+    assert {record['daily_session_id'] for record in records if record['type'] == 'session_exercise'} == session_ids
+    assert records[-2]['weight_kg'] == 80.0
+    assert records[-1]['goal_type'] == 'weight_loss'
+
+
+def test_csv_export_is_one_table(client, auth_headers):
+    seed_user_data(client, auth_headers)
+
+    response = client.get('/export?format=csv', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    reader = csv.DictReader(io.StringIO(response.get_data(as_text=True)))
+    assert reader.fieldnames[0] == 'record_type'
+    assert {'title', 'day_of_week', 'exercise_id', 'weight_kg', 'goal_type'} <= set(reader.fieldnames)
+    assert len(reader.fieldnames) == len(set(reader.fieldnames))
+    rows = list(reader)
+    assert [row['record_type'] for row in rows] == (
+        ['plan'] + ['session'] * 2 + ['session_exercise'] * 4 + ['weight', 'goal']
+    )
+    # columns a record type does not have are left empty
+    assert rows[0]['title'] == 'Plan' and rows[0]['weight_kg'] == ''
+    assert rows[-2]['weight_kg'] == '80.0' and rows[-2]['title'] == ''
+
+
+def test_export_only_includes_the_callers_data(client, auth_headers, register):
+    seed_user_data(client, auth_headers, title='Alice plan')
+    bob_headers = {'Authorization': f"Bearer {register('bob')['access_token']}"}
+    seed_user_data(client, bob_headers, title='Bob plan')
+
+    alice = [json.loads(line) for line in client.get('/export', headers=auth_headers).get_data(as_text=True).splitlines()]
+    bob = [json.loads(line) for line in client.get('/export', headers=bob_headers).get_data(as_text=True).splitlines()]
+
+    assert [record['title'] for record in alice if record['type'] == 'plan'] == ['Alice plan']
+    assert [record['title'] for record in bob if record['type'] == 'plan'] == ['Bob plan']
+    for record_type in ('session', 'session_exercise', 'weight', 'goal'):
+        alice_ids = {record['id'] for record in alice if record['type'] == record_type}
+        bob_ids = {record['id'] for record in bob if record['type'] == record_type}
+        assert alice_ids and bob_ids and not alice_ids & bob_ids
+
+
+def test_export_headers(client, auth_headers):
+    for export_format in ('ndjson', 'csv'):
+        response = client.get(f'/export?format={export_format}', headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers['Content-Disposition'] == f'attachment; filename="workout-export.{export_format}"'
+        assert response.headers['Cache-Control'] == 'no-store'
+
+
+def test_export_of_empty_account(client, auth_headers):
+    assert client.get('/export', headers=auth_headers).get_data(as_text=True) == ''
+    body = client.get('/export?format=csv', headers=auth_headers).get_data(as_text=True)
+    assert body.splitlines()[0].startswith('record_type,')
+    assert len(body.splitlines()) == 1
+
+
+def test_export_rejects_unknown_format(client, auth_headers):
+    assert client.get('/export?format=xml', headers=auth_headers).status_code == 422
+
+
+def test_export_requires_auth(client):
+    assert client.get('/export').status_code == 401
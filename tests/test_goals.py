@@ -0,0 +1,98 @@
+def post_weight(client, headers, weight_kg):
+    assert client.post('/weight', json={'weight_kg': weight_kg}, headers=headers).status_code == 201
+
+
+def set_goal(client, headers, goal_type, target_value):
+    response = client.post('/goals', json={'goal_type': goal_type, 'target_value': target_value}, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()['goal_id']
+
+
+def get_goal(client, headers, goal_id):
+    return next(goal for goal in client.get('/goals', headers=headers).get_json() if goal['id'] == goal_id)
+
+
+def test_weight_loss_progress(client, auth_headers):
+    post_weight(client, auth_headers, 90)
+    goal_id = set_goal(client, auth_headers, 'weight_loss', 80)
+    post_weight(client, auth_headers, 87)
+
+    goal = get_goal(client, auth_headers, goal_id)
+    assert (goal['start_value'], goal['current_value'], goal['progress_pct']) == (90.0, 87.0, 30.0)
+    assert goal['is_achieved'] is False
+
+
+def test_weight_gain_progress_and_achievement(client, auth_headers):
+    post_weight(client, auth_headers, 70)
+    goal_id = set_goal(client, auth_headers, 'weight_gain', 80)
+
+    post_weight(client, auth_headers, 75)
+    assert get_goal(client, auth_headers, goal_id)['progress_pct'] == 50.0
+
+    # moving the wrong way never goes below zero
+    post_weight(client, auth_headers, 68)
+    assert get_goal(client, auth_headers, goal_id)['progress_pct'] == 0.0
+
+    post_weight(client, auth_headers, 81)
+    goal = get_goal(client, auth_headers, goal_id)
+    assert (goal['progress_pct'], goal['is_achieved']) == (100.0, True)
+
+
+def test_target_weight_picks_its_direction(client, auth_headers):
+    post_weight(client, auth_headers, 90)
+    down = set_goal(client, auth_headers, 'target_weight', 80)
+    up = set_goal(client, auth_headers, 'target_weight', 100)
+
+    post_weight(client, auth_headers, 85)
+
+    assert get_goal(client, auth_headers, down)['progress_pct'] == 50.0
+    assert get_goal(client, auth_headers, up)['progress_pct'] == 0.0
+
+    post_weight(client, auth_headers, 95)
+
+    assert get_goal(client, auth_headers, down)['progress_pct'] == 0.0
+    assert get_goal(client, auth_headers, up)['progress_pct'] == 50.0
+
+
+def test_goal_already_met_at_start(client, auth_headers):
+    post_weight(client, auth_headers, 75)
+
+    goal_id = set_goal(client, auth_headers, 'weight_loss', 80)
+
+    goal = get_goal(client, auth_headers, goal_id)
+    assert (goal['progress_pct'], goal['is_achieved']) == (100.0, True)
+
+
+def test_goal_created_before_any_weight(client, auth_headers):
+    goal_id = set_goal(client, auth_headers, 'weight_loss', 80)
+
+    goal = get_goal(client, auth_headers, goal_id)
+    assert (goal['start_value'], goal['current_value'], goal['progress_pct']) == (None, None, 0.0)
+
+    # the first entry becomes the starting weight
+    post_weight(client, auth_headers, 90)
+    goal = get_goal(client, auth_headers, goal_id)
+    assert (goal['start_value'], goal['progress_pct']) == (90.0, 0.0)
+
+    post_weight(client, auth_headers, 85)
+    assert get_goal(client, auth_headers, goal_id)['progress_pct'] == 50.0
+
+
+def test_other_goal_types_are_not_tracked(client, auth_headers):
+    post_weight(client, auth_headers, 90)
+    goal_id = set_goal(client, auth_headers, 'workouts_per_week', 4)
+    post_weight(client, auth_headers, 85)
+
+    goal = get_goal(client, auth_headers, goal_id)
+    assert (goal['progress_pct'], goal['start_value'], goal['current_value']) == (None, None, None)
+    assert goal['is_achieved'] is False
+
+
+def test_achieved_goals_stop_updating(client, auth_headers):
+    post_weight(client, auth_headers, 90)
+    goal_id = set_goal(client, auth_headers, 'weight_loss', 80)
+    post_weight(client, auth_headers, 79)
+    post_weight(client, auth_headers, 84)
+
+    goal = get_goal(client, auth_headers, goal_id)
+    assert (goal['current_value'], goal['progress_pct'], goal['is_achieved']) == (79.0, 100.0, True)
@@ -0,0 +1,30 @@
+from sqlalchemy.exc import OperationalError
+
+from db import db
+
+
+def test_healthz(client):
+    response = client.get('/healthz')
+
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'ok'}
+
+
+def test_readyz(client):
+    response = client.get('/readyz')
+
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'ok', 'database': 'ok'}
+
+
+def test_readyz_when_database_is_down(client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OperationalError('SELECT 1', {}, Exception('could not connect to server at db.internal:5432'))
+
+    monkeypatch.setattr(db.session, 'execute', fail)
+
+    response = client.get('/readyz')
+
+    assert response.status_code == 503
+    assert response.get_json() == {'status': 'unavailable', 'database': 'unavailable'}
+    assert b'db.internal' not in response.data
@@ -0,0 +1,66 @@
+import logging
+import re
+
+import pytest
+
+from app import create_app
+from config import TestingConfig
+from db import db
+from instrumentation import instrumentation
+
+SERVER_TIMING = re.compile(r'^app;dur=\d+\.\d{2}, db;dur=\d+\.\d{2};desc="(\d+) queries"$')
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    instrumentation.metrics.reset()
+
+
+def test_server_timing_header(client, auth_headers):
+    response = client.get('/goals', headers=auth_headers)
+
+    match = SERVER_TIMING.match(response.headers['Server-Timing'])
+    assert match is not None
+    assert match.group(1) == '1'
+
+
+def test_metrics_exposes_counters_and_histograms(client, auth_headers):
+    client.get('/goals', headers=auth_headers)
+    client.get('/goals', headers=auth_headers)
+    client.get('/nowhere')
+
+    body = client.get('/metrics').get_data(as_text=True)
+
+    assert 'http_requests_total{method="GET",endpoint="/goals",status="200"} 2' in body
+    assert 'http_requests_total{method="GET",endpoint="unmatched",status="404"} 1' in body
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",endpoint="/goals",le="+Inf"} 2' in body
+    assert 'http_request_duration_seconds_count{method="GET",endpoint="/goals"} 2' in body
+    # the first call is a cache miss with one query, the second a hit with none
+    assert 'http_request_db_queries_bucket{method="GET",endpoint="/goals",le="0"} 1' in body
+    assert 'http_request_db_queries_bucket{method="GET",endpoint="/goals",le="1"} 2' in body
+    assert 'http_request_db_queries_sum{method="GET",endpoint="/goals"} 1.000000' in body
+    assert re.search(r'^db_slow_queries_total \d+$', body, re.MULTILINE)
+    assert 'response_cache_' in body
+
+
+def test_slow_query_is_logged_with_call_site(caplog):
+    class SlowQueryConfig(TestingConfig):
+        SLOW_QUERY_THRESHOLD_MS = 0
+
+    app = create_app(SlowQueryConfig)
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.post('/register', json={'username': 'alice', 'email': 'alice@example.com', 'password': 'password'})
+        token = client.post('/login', json={'username': 'alice', 'password': 'password'}).get_json()['access_token']
+
+        with caplog.at_level(logging.WARNING, logger='workout.sql'):
+            client.get('/goals', headers={'Authorization': f'Bearer {token}'})
+        db.session.remove()
+        db.drop_all()
+
+    messages = [record.getMessage() for record in caplog.records if record.name == 'workout.sql']
+    assert any(re.match(r'Slow query \(\d+\.\d ms\) at routes\.py:\d+ in get_goals: SELECT', message)
+               for message in messages), messages
+    assert instrumentation.metrics.slow_queries >= 1
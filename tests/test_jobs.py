@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+from db import db
+from jobs import job_queue, utcnow
+from models import Job
+
+
+def make_due(job_id):
+    # skip the retry backoff
+    db.session.get(Job, job_id).run_after = utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_recompute_goals_job(client, auth_headers, app):
+    client.post('/weight', json={'weight_kg': 90}, headers=auth_headers)
+    client.post('/goals', json={'goal_type': 'weight_loss', 'target_value': 80}, headers=auth_headers)
+    client.post('/weight', json={'weight_kg': 85}, headers=auth_headers)
+
+    response = client.post('/goals/recompute', headers=auth_headers)
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'queued'
+
+    assert job_queue.run_pending(app) == 1
+
+    job = client.get(response.headers['Location'], headers=auth_headers).get_json()
+    assert job['status'] == 'succeeded'
+    assert job['result'] == {'updated': 1, 'weight_kg': 85.0}
+    assert client.get('/goals', headers=auth_headers).get_json()[0]['progress_pct'] == 50.0
+
+
+def test_idempotency_key_returns_the_same_job(client, auth_headers, app):
+    headers = dict(auth_headers, **{'Idempotency-Key': 'recompute-1'})
+
+    first = client.post('/goals/recompute', headers=headers)
+    second = client.post('/goals/recompute', headers=headers)
+    other = client.post('/goals/recompute', headers=dict(auth_headers, **{'Idempotency-Key': 'recompute-2'}))
+
+    assert (first.status_code, second.status_code, other.status_code) == (202, 200, 202)
+    assert first.get_json()['id'] == second.get_json()['id'] != other.get_json()['id']
+    assert job_queue.run_pending(app) == 2
+
+
+def test_failed_job_is_retried_then_marked_failed(app, monkeypatch):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload)
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(job_queue.tasks, 'flaky', (flaky, 2))
+    job, created = job_queue.enqueue('flaky', {'n': 1})
+    assert created
+
+    assert job_queue.run_pending(app) == 1
+    job = db.session.get(Job, job.id, populate_existing=True)
+    assert (job.status, job.attempts) == ('queued', 1)
+    assert job.run_after > utcnow()
+    # backing off: nothing is due yet
+    assert job_queue.run_pending(app) == 0
+
+    make_due(job.id)
+    assert job_queue.run_pending(app) == 1
+    job = db.session.get(Job, job.id, populate_existing=True)
+    assert (job.status, job.attempts, job.error) == ('failed', 2, 'RuntimeError: boom')
+    assert calls == [{'n': 1, 'user_id': None}] * 2
+
+
+def test_retry_succeeds(app, monkeypatch):
+    outcomes = [RuntimeError('transient'), None]
+
+    def sometimes(payload):
+        outcome = outcomes.pop(0)
+        if outcome:
+            raise outcome
+        return {'ok': True}
+
+    monkeypatch.setitem(job_queue.tasks, 'sometimes', (sometimes, 3))
+    job, _ = job_queue.enqueue('sometimes')
+
+    job_queue.run_pending(app)
+    make_due(job.id)
+    job_queue.run_pending(app)
+
+    job = db.session.get(Job, job.id, populate_existing=True)
+    assert (job.status, job.attempts, job.result, job.error) == ('succeeded', 2, {'ok': True}, None)
+
+
+def test_expired_lease_is_reclaimed(app, monkeypatch):
+    monkeypatch.setitem(job_queue.tasks, 'noop', (lambda payload: 'done', 3))
+    job, _ = job_queue.enqueue('noop')
+    # a worker claimed it and died
+    stuck = db.session.get(Job, job.id)
+    stuck.status = 'running'
+    stuck.attempts = 1
+    stuck.locked_until = utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    assert job_queue.run_pending(app) == 1
+    job = db.session.get(Job, job.id, populate_existing=True)
+    assert (job.status, job.attempts) == ('succeeded', 2)
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(app, monkeypatch):
+    calls = []
+    monkeypatch.setitem(job_queue.tasks, 'crashes', (calls.append, 2))
+    job, _ = job_queue.enqueue('crashes')
+    # every attempt so far killed its worker
+    stuck = db.session.get(Job, job.id)
+    stuck.status = 'running'
+    stuck.attempts = 2
+    stuck.locked_until = utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    assert job_queue.run_pending(app) == 0
+    job = db.session.get(Job, job.id, populate_existing=True)
+    assert (job.status, job.attempts, job.locked_until) == ('failed', 2, None)
+    assert job.error == 'Lease expired on the final attempt'
+    assert calls == []
+
+
+def test_live_lease_is_not_reclaimed(app, monkeypatch):
+    monkeypatch.setitem(job_queue.tasks, 'noop', (lambda payload: 'done', 3))
+    job, _ = job_queue.enqueue('noop')
+    running = db.session.get(Job, job.id)
+    running.status = 'running'
+    running.attempts = 1
+    running.locked_until = utcnow() + timedelta(seconds=60)
+    db.session.commit()
+
+    assert job_queue.run_pending(app) == 0
+    assert db.session.get(Job, job.id, populate_existing=True).status == 'running'
+
+
+def test_heartbeat_renews_the_lease(app, monkeypatch):
+    leases = []
+
+    def long_task(payload):
+        before = db.session.get(Job, payload['job_id'], populate_existing=True).locked_until
+        # pretend the lease is nearly up
+        db.session.get(Job, payload['job_id']).locked_until = utcnow()
+        db.session.commit()
+        assert job_queue.heartbeat()
+        leases.append((before, db.session.get(Job, payload['job_id'], populate_existing=True).locked_until))
+        return 'done'
+
+    monkeypatch.setitem(job_queue.tasks, 'long', (long_task, 1))
+    job, _ = job_queue.enqueue('long')
+    job.payload = {'job_id': job.id}
+    db.session.commit()
+
+    assert job_queue.run_pending(app) == 1
+    [(before, renewed)] = leases
+    assert renewed >= before > utcnow()
+    assert db.session.get(Job, job.id, populate_existing=True).status == 'succeeded'
+
+
+def test_heartbeat_reports_a_lost_lease(app, monkeypatch):
+    beats = []
+
+    def reclaimed(payload):
+        # another worker took the job over after our lease expired
+        db.session.get(Job, payload['job_id']).attempts += 1
+        db.session.commit()
+        beats.append(job_queue.heartbeat())
+
+    monkeypatch.setitem(job_queue.tasks, 'reclaimed', (reclaimed, 3))
+    job, _ = job_queue.enqueue('reclaimed')
+    job.payload = {'job_id': job.id}
+    db.session.commit()
+
+    job_queue.run_pending(app)
+
+    assert beats == [False]
+    # outside a job there is no lease to renew
+    assert job_queue.heartbeat() is False
+
+
+def test_jobs_are_private(client, register):
+    alice = {'Authorization': f"Bearer {register('alice')['access_token']}"}
+    bob = {'Authorization': f"Bearer {register('bob')['access_token']}"}
+
+    location = client.post('/goals/recompute', headers=alice).headers['Location']
+
+    assert client.get(location, headers=bob).status_code == 404
@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from passwords import HasherBusy, PasswordHasher
+
+
+def test_limits_leave_a_request_thread_free(app):
+    hasher = PasswordHasher()
+    hasher.init_app(app, request_threads=4)
+    assert (hasher.workers, hasher.queue_size) == (1, 2)
+
+    hasher.init_app(app, request_threads=2)
+    assert (hasher.workers, hasher.queue_size) == (1, 0)
+    hasher.shutdown()
+
+
+def test_sheds_load_with_429_when_full(app):
+    hasher = PasswordHasher()
+    hasher.init_app(app, request_threads=2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_hash(password):
+        started.set()
+        release.wait(5)
+        return b'hash'
+
+    hasher.bcrypt.generate_password_hash = slow_hash
+    worker = threading.Thread(target=hasher.hash, args=('first',))
+    worker.start()
+    started.wait(5)
+    try:
+        with pytest.raises(HasherBusy) as excinfo:
+            hasher.hash('second')
+        assert excinfo.value.status_code == 429
+    finally:
+        release.set()
+        worker.join()
+        hasher.shutdown()
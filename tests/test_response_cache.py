@@ -0,0 +1,37 @@
+import importlib
+
+import pytest
+
+import config
+from response_cache import CacheBackend
+
+
+def test_write_invalidates_cached_read(client, auth_headers):
+    assert client.get('/weight', headers=auth_headers).headers['X-Cache'] == 'MISS'
+    assert client.get('/weight', headers=auth_headers).headers['X-Cache'] == 'HIT'
+
+    client.post('/weight', json={'weight_kg': 80}, headers=auth_headers)
+
+    response = client.get('/weight', headers=auth_headers)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert [entry['weight_kg'] for entry in response.get_json()] == [80.0]
+
+
+def test_production_needs_a_shared_backend(monkeypatch):
+    monkeypatch.delenv('RESPONSE_CACHE_BACKEND', raising=False)
+    assert importlib.reload(config).ProductionConfig.RESPONSE_CACHE_ENABLED is False
+
+    monkeypatch.setenv('RESPONSE_CACHE_BACKEND', 'redis_cache:RedisBackend')
+    assert importlib.reload(config).ProductionConfig.RESPONSE_CACHE_ENABLED is True
+
+    monkeypatch.delenv('RESPONSE_CACHE_BACKEND')
+    importlib.reload(config)
+
+
+def test_backend_must_implement_interface():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,77 @@
+from db import db
+from models import Exercise
+from search import exercise_search
+
+
+def search(client, query, **params):
+    response = client.get('/exercises/search', query_string={'q': query, **params})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_name_matches_rank_first(client):
+    results = search(client, 'pull')
+
+    assert [result['name'] for result in results] == ['Pull-up', 'Commando Pull-up', 'Muscle Up']
+    scores = [result['score'] for result in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_hyphenated_names_match_every_spelling(client):
+    for query in ('pull-up', 'pullup', 'pull up'):
+        assert search(client, query)[0]['name'] == 'Pull-up'
+
+
+def test_last_word_matches_as_prefix(client):
+    names = [result['name'] for result in search(client, 'squ')]
+    assert set(names[:3]) == {'Chair Squat', 'Bodyweight Squat', 'Pistol Squat'}
+    assert len(names) > 3
+    assert [result['name'] for result in search(client, 'pistol squ')] == ['Pistol Squat']
+    # only the word being typed is a prefix
+    assert search(client, 'pist squat') == []
+
+
+def test_exact_terms_outrank_prefix_matches(client):
+    exact = {result['name']: result['score'] for result in search(client, 'pushup')}
+    prefix = {result['name']: result['score'] for result in search(client, 'pushu')}
+
+    assert exact.keys() == prefix.keys()
+    assert all(prefix[name] < exact[name] for name in exact)
+
+
+def test_no_match(client):
+    assert search(client, 'zzz') == []
+    assert search(client, '---') == []
+
+
+def test_result_shapes(client):
+    full = search(client, 'bridge')
+    typeahead = search(client, 'bridge', typeahead='true')
+
+    assert set(full[0]) == {'id', 'name', 'description', 'guide', 'score'}
+    assert [set(result) for result in typeahead] == [{'id', 'name'}] * len(full)
+    assert [result['id'] for result in typeahead] == [result['id'] for result in full]
+
+
+def test_limit(client):
+    assert len(search(client, 'exercise')) == 10
+    assert len(search(client, 'exercise', limit=3)) == 3
+    assert search(client, 'exercise', limit=3) == search(client, 'exercise', limit=10)[:3]
+    assert client.get('/exercises/search?q=exercise&limit=0').status_code == 422
+    assert client.get('/exercises/search?q=exercise&limit=51').status_code == 422
+
+
+def test_rebuild_publishes_a_new_snapshot(client):
+    search(client, 'bridge')
+    before = exercise_search._snapshot
+
+    db.session.get(Exercise, 1).name = 'Hip Bridge'
+    db.session.commit()
+
+    assert search(client, 'hip')[0]['name'] == 'Hip Bridge'
+    after = exercise_search._snapshot
+    assert after is not before
+    assert after.version != before.version
+    # a search still holding the old snapshot keeps a consistent view
+    assert before.documents[1].name == 'Bridge'
+    assert 'hip' not in before.postings or 1 not in before.postings['hip']
@@ -0,0 +1,37 @@
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from schemas import GoalResponseSchema, PlanSchema, WeightBucketSchema
+from serialization import compile_serializer
+
+
+def test_matches_dump_for_non_native_values():
+    # what PostgreSQL returns for the date_trunc bucket and numeric aggregates
+    row = SimpleNamespace(bucket=date(2026, 10, 12), count=Decimal('3'), min=Decimal('80.5'),
+                          max=81, avg=Decimal('80.75'), last=None)
+    schema = WeightBucketSchema(many=True)
+
+    assert compile_serializer(schema)([row]) == schema.dump([row])
+    assert compile_serializer(schema)([row])[0]['bucket'] == '2026-10-12'
+
+
+def test_matches_dump_for_nested_tree():
+    exercise = SimpleNamespace(name='Bridge', description='d', guide='g')
+    plan = SimpleNamespace(
+        id=1, title='Plan', goal='Fitness', frequency='3x', duration_min=45, date_created=datetime(2026, 1, 1),
+        daily_sessions=[SimpleNamespace(id=2, day_of_week='Monday', session_exercises=[
+            SimpleNamespace(sets=3, reps=None, duration_min=20, distance_km=2, exercise=exercise)
+        ])]
+    )
+    schema = PlanSchema(many=True)
+
+    assert compile_serializer(schema)([plan]) == schema.dump([plan])
+
+
+def test_matches_dump_for_goals():
+    goal = SimpleNamespace(id=1, goal_type='weight_loss', target_value=80, is_achieved=0, progress_pct=None,
+                           start_value=Decimal('90'), current_value=85.0, updated_at=None)
+    schema = GoalResponseSchema()
+
+    assert compile_serializer(schema)(goal) == schema.dump(goal)
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import make_plan
+from db import db
+from models import TrainingVolume, WorkoutPlan
+
+MEASURES = {'entries', 'sets', 'reps', 'minutes', 'km'}
+
+
+def create_plan(client, headers, plan):
+    response = client.post('/workout_plans', json=plan, headers=headers)
+    assert response.status_code == 201
+    return response.get_json()['plan_id']
+
+
+def rollup(plan_id):
+    rows = TrainingVolume.query.filter_by(workout_plan_id=plan_id).order_by(
+        TrainingVolume.day_of_week, TrainingVolume.exercise_id).all()
+    return [(row.day_of_week, row.exercise_id, row.entries, row.sets, row.reps, row.minutes, row.km) for row in rows]
+
+
+def volume(client, headers, **params):
+    response = client.get('/stats/volume', query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.fixture
+def plans(client, auth_headers):
+    # A: Monday and Tuesday x exercises 1, 2; B: Monday x exercises 1, 2, 3
+    return (
+        create_plan(client, auth_headers, make_plan(sessions=2, exercises=2, title='A')),
+        create_plan(client, auth_headers, make_plan(sessions=1, exercises=3, title='B')),
+    )
+
+
+def test_create_fills_the_rollup(client, auth_headers):
+    plan_id = create_plan(client, auth_headers, make_plan(sessions=2, exercises=2))
+
+    assert rollup(plan_id) == [
+        ('Monday', 1, 1, 3, 30, 0, 0.0),
+        ('Monday', 2, 1, 3, 30, 0, 0.0),
+        ('Tuesday', 1, 1, 3, 30, 0, 0.0),
+        ('Tuesday', 2, 1, 3, 30, 0, 0.0),
+    ]
+    row = TrainingVolume.query.filter_by(workout_plan_id=plan_id).first()
+    assert row.plan_created == db.session.get(WorkoutPlan, plan_id).date_created
+
+
+def test_batch_create_fills_the_rollup(client, auth_headers):
+    timed = make_plan(title='Timed')
+    timed['daily_sessions'][0]['session_exercises'] = [
+        {'exercise_id': 17, 'sets': 2, 'reps': None, 'duration_min': 20, 'distance_km': 2.5},
+        {'exercise_id': 17, 'sets': 1, 'reps': 15},
+    ]
+    response = client.post('/workout_plans/batch', json={'plans': [make_plan(title='Plain'), timed]},
+                           headers=auth_headers)
+    assert response.status_code == 201
+    plain_id, timed_id = [result['plan_id'] for result in response.get_json()['results']]
+
+    assert rollup(plain_id) == [('Monday', 1, 1, 3, 30, 0, 0.0)]
+    # both entries of the same exercise on the same day share a row
+    assert rollup(timed_id) == [('Monday', 17, 2, 3, 15, 40, 5.0)]
+
+
+def test_each_plan_gets_its_own_creation_time(client, auth_headers, plans):
+    first, second = (db.session.get(WorkoutPlan, plan_id).date_created for plan_id in plans)
+    assert first < second
+
+
+@pytest.mark.parametrize('group_by, keys, rows', [
+    ('', set(), [(7,)]),
+    ('exercise', {'exercise_id', 'exercise'},
+     [('Bridge', 3), ('Chair Squat', 3), ('Knee Pushup', 1)]),
+    ('day', {'day_of_week'}, [('Monday', 5), ('Tuesday', 2)]),
+    ('plan', {'plan_id', 'plan_title'}, [('A', 4), ('B', 3)]),
+    ('plan,day', {'plan_id', 'plan_title', 'day_of_week'},
+     [('A', 'Monday', 2), ('A', 'Tuesday', 2), ('B', 'Monday', 3)]),
+    ('plan,exercise', {'plan_id', 'plan_title', 'exercise_id', 'exercise'},
+     [('A', 'Bridge', 2), ('A', 'Chair Squat', 2), ('B', 'Bridge', 1), ('B', 'Chair Squat', 1),
+      ('B', 'Knee Pushup', 1)]),
+    ('day,exercise', {'day_of_week', 'exercise_id', 'exercise'},
+     [('Monday', 'Bridge', 2), ('Monday', 'Chair Squat', 2), ('Monday', 'Knee Pushup', 1),
+      ('Tuesday', 'Bridge', 1), ('Tuesday', 'Chair Squat', 1)]),
+    ('exercise,day,plan', {'plan_id', 'plan_title', 'day_of_week', 'exercise_id', 'exercise'},
+     [('A', 'Monday', 'Bridge', 1), ('A', 'Monday', 'Chair Squat', 1), ('A', 'Tuesday', 'Bridge', 1),
+      ('A', 'Tuesday', 'Chair Squat', 1), ('B', 'Monday', 'Bridge', 1), ('B', 'Monday', 'Chair Squat', 1),
+      ('B', 'Monday', 'Knee Pushup', 1)]),
+])
+def test_group_by(client, auth_headers, plans, group_by, keys, rows):
+    body = volume(client, auth_headers, group_by=group_by)
+
+    assert all(set(row) == keys | MEASURES for row in body)
+    labels = [name for name in ('plan_title', 'day_of_week', 'exercise') if name in keys]
+    assert [tuple(row[name] for name in labels) + (row['entries'],) for row in body] == rows
+    assert all(row['sets'] == row['entries'] * 3 and row['reps'] == row['sets'] * 10 for row in body)
+    assert all(isinstance(row['km'], float) for row in body)
+
+
+def test_default_groups_by_exercise(client, auth_headers, plans):
+    assert volume(client, auth_headers) == volume(client, auth_headers, group_by='exercise')
+
+
+def test_filters(client, auth_headers, plans):
+    plan_a, plan_b = plans
+
+    assert volume(client, auth_headers, group_by='plan', plan_id=plan_b)[0]['plan_id'] == plan_b
+    assert len(volume(client, auth_headers, group_by='plan', plan_id=plan_b)) == 1
+    assert volume(client, auth_headers, group_by='', days='Tuesday')[0]['entries'] == 2
+    assert volume(client, auth_headers, group_by='', days='Monday,Tuesday')[0]['entries'] == 7
+    assert volume(client, auth_headers, group_by='day', plan_id=plan_a, days='Tuesday') == [
+        {'day_of_week': 'Tuesday', 'entries': 2, 'sets': 6, 'reps': 60, 'minutes': 0, 'km': 0.0}
+    ]
+
+
+def test_created_range_filter(client, auth_headers, plans):
+    for plan_id, created in zip(plans, (datetime(2026, 1, 1), datetime(2026, 2, 1))):
+        db.session.get(WorkoutPlan, plan_id).date_created = created
+    TrainingVolume.refresh(plans)
+    db.session.commit()
+
+    def titles(**params):
+        return [row['plan_title'] for row in volume(client, auth_headers, group_by='plan', **params)]
+
+    assert titles(**{'from': '2026-01-15T00:00:00'}) == ['B']
+    assert titles(to='2026-01-15T00:00:00') == ['A']
+    # the range is half-open
+    assert titles(**{'from': '2026-01-01T00:00:00', 'to': '2026-02-01T00:00:00'}) == ['A']
+    assert titles(**{'from': '2026-03-01T00:00:00'}) == []
+
+
+def test_only_the_callers_plans_are_summed(client, auth_headers, register, plans):
+    bob = {'Authorization': f"Bearer {register('bob')['access_token']}"}
+    bob_plan = create_plan(client, bob, make_plan(title='Bob'))
+
+    assert [row['plan_title'] for row in volume(client, auth_headers, group_by='plan')] == ['A', 'B']
+    assert volume(client, auth_headers, group_by='plan', plan_id=bob_plan) == []
+    assert volume(client, bob, group_by='plan') == [
+        {'plan_id': bob_plan, 'plan_title': 'Bob', 'entries': 1, 'sets': 3, 'reps': 30, 'minutes': 0, 'km': 0.0}
+    ]
+
+
+def test_new_plans_invalidate_the_cached_volume(client, auth_headers):
+    first = client.get('/stats/volume?group_by=', headers=auth_headers)
+    assert first.headers['X-Cache'] == 'MISS'
+    assert first.get_json()[0]['entries'] == 0
+    assert client.get('/stats/volume?group_by=', headers=auth_headers).headers['X-Cache'] == 'HIT'
+
+    create_plan(client, auth_headers, make_plan(exercises=2))
+    response = client.get('/stats/volume?group_by=', headers=auth_headers)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()[0]['entries'] == 2
+
+    assert client.get('/stats/volume?group_by=', headers=auth_headers).headers['X-Cache'] == 'HIT'
+    client.post('/workout_plans/batch', json={'plans': [make_plan(exercises=3)]}, headers=auth_headers)
+    response = client.get('/stats/volume?group_by=', headers=auth_headers)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()[0]['entries'] == 5
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from db import db
+from models import User, WeightInsert
+
+
+def add_weights(username, count, start=datetime(2026, 1, 1)):
+    user = User.query.filter_by(username=username).one()
+    # pairs of entries share a timestamp so the id tie-break is exercised
+    db.session.add_all([
+        WeightInsert(weight_kg=80 + i / 10, date_recorded=start + timedelta(days=i // 2), user_id=user.id)
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def fetch_all_pages(client, headers, query):
+    entries = []
+    pages = 0
+    cursor = None
+    while True:
+        url = f'/weight?{query}' + (f'&cursor={cursor}' if cursor else '')
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        entries += response.get_json()
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            return entries, pages
+
+
+def test_cursor_pagination_walks_every_entry_once(client, auth_headers):
+    add_weights('alice', 25)
+
+    entries, pages = fetch_all_pages(client, auth_headers, 'limit=4')
+
+    assert pages == 7
+    assert len(entries) == 25
+    assert len({entry['id'] for entry in entries}) == 25
+    keys = [(entry['date_recorded'], entry['id']) for entry in entries]
+    assert keys == sorted(keys)
+
+
+def test_pagination_respects_range(client, auth_headers):
+    add_weights('alice', 20)
+
+    entries, _ = fetch_all_pages(client, auth_headers, 'limit=3&from=2026-01-03T00:00:00&to=2026-01-06T00:00:00')
+
+    assert [entry['date_recorded'][:10] for entry in entries] == [
+        '2026-01-03', '2026-01-03', '2026-01-04', '2026-01-04', '2026-01-05', '2026-01-05'
+    ]
+
+
+def test_last_page_has_no_cursor(client, auth_headers):
+    add_weights('alice', 4)
+
+    response = client.get('/weight?limit=4', headers=auth_headers)
+
+    assert len(response.get_json()) == 4
+    assert 'X-Next-Cursor' not in response.headers
+
+
+def test_invalid_cursor(client, auth_headers):
+    response = client.get('/weight?cursor=not-a-cursor', headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_weight_buckets(client, auth_headers):
+    add_weights('alice', 6)
+
+    response = client.get('/weight?bucket=day', headers=auth_headers)
+
+    assert [(row['bucket'], row['count'], row['last']) for row in response.get_json()] == [
+        ('2026-01-01', 2, 80.1), ('2026-01-02', 2, 80.3), ('2026-01-03', 2, 80.5)
+    ]
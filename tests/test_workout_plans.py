@@ -0,0 +1,109 @@
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from conftest import make_plan
+from db import db
+
+
+def capture_statements(fn):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+def test_get_workout_plans_returns_tree(client, auth_headers):
+    client.post('/workout_plans', json=make_plan(sessions=2, exercises=2), headers=auth_headers)
+
+    response = client.get('/workout_plans', headers=auth_headers)
+
+    assert response.status_code == 200
+    [plan] = response.get_json()
+    assert len(plan['daily_sessions']) == 2
+    assert [ex['exercise_name'] for ex in plan['daily_sessions'][0]['exercises']] == ['Bridge', 'Chair Squat']
+
+
+def test_get_workout_plans_query_count_is_constant(client, register):
+    counts = []
+    for index, (sessions, exercises) in enumerate([(1, 1), (3, 3), (6, 6)]):
+        tokens = register(f'user{index}')
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        client.post('/workout_plans', json=make_plan(sessions, exercises), headers=headers)
+        client.post('/workout_plans', json=make_plan(sessions, exercises), headers=headers)
+
+        def get_plans():
+            response = client.get('/workout_plans', headers=headers)
+            assert response.status_code == 200
+            assert response.headers['X-Cache'] == 'MISS'
+
+        counts.append(len(capture_statements(get_plans)))
+
+    assert counts == [4, 4, 4]
+
+
+def test_create_workout_plan_rejects_unknown_exercise(client, auth_headers):
+    plan = make_plan()
+    plan['daily_sessions'][0]['session_exercises'][0]['exercise_id'] = 9999
+
+    response = client.post('/workout_plans', json=plan, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Unknown exercise_id 9999'
+    assert client.get('/workout_plans', headers=auth_headers).get_json() == []
+
+
+def test_batch_reports_each_plan(client, auth_headers):
+    unknown_exercise = make_plan(title='Unknown')
+    unknown_exercise['daily_sessions'][0]['session_exercises'][0]['exercise_id'] = 9999
+    plans = [make_plan(title='First'), {'title': 'Invalid'}, unknown_exercise, make_plan(2, 2, title='Last')]
+
+    response = client.post('/workout_plans/batch', json={'plans': plans}, headers=auth_headers)
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (2, 2)
+    assert [result['status'] for result in body['results']] == ['created', 'failed', 'failed', 'created']
+    assert body['results'][2]['error'] == 'Unknown exercise_id 9999'
+    titles = {plan['id']: plan['title'] for plan in client.get('/workout_plans', headers=auth_headers).get_json()}
+    assert titles == {body['results'][0]['plan_id']: 'First', body['results'][3]['plan_id']: 'Last'}
+
+
+def test_batch_all_invalid_is_rejected(client, auth_headers):
+    response = client.post('/workout_plans/batch', json={'plans': [{'title': 'Invalid'}]}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['created'] == 0
+
+
+def test_batch_inserts_each_table_once(client, auth_headers):
+    plans = [make_plan(3, 2, title=f'Plan {i}') for i in range(5)]
+    responses = []
+
+    statements = capture_statements(
+        lambda: responses.append(client.post('/workout_plans/batch', json={'plans': plans}, headers=auth_headers))
+    )
+
+    assert responses[0].status_code == 201
+    inserts = [statement.split()[2] for statement in statements if statement.startswith('INSERT INTO')]
+    assert inserts.count('workout_plan') == 1
+    assert inserts.count('daily_session') == 1
+    assert inserts.count('session_exercise') == 1
+
+
+def test_database_errors_are_not_leaked(client, auth_headers, monkeypatch):
+    def fail():
+        raise OperationalError('INSERT INTO workout_plan ...', {}, Exception('disk I/O error'))
+
+    monkeypatch.setattr(db.session, 'commit', fail)
+
+    response = client.post('/workout_plans', json=make_plan(), headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.get_json() == {'message': 'Failed to create workout plan'}